@@ -0,0 +1,285 @@
+"""
+Aggregate defect analytics over stored summary files.
+
+Summaries of the defect groups (processed_results/defectA and
+processed_results/defectB) are ingested once into a small SQLite
+database of pre-aggregated counts (per day, user and class) and
+confidence histograms, so queries cost O(days x classes) no matter how
+many captures exist. Summary files are treated as write-once: a file
+already ingested is never read again, and directories whose mtime hasn't
+changed are not listed again.
+
+    python analytics.py            # ingest + print a report for everyone
+    python analytics.py reinspect/processed_results/defectA
+    python analytics.py --user a@b.c
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from db import HISTORY_DIR
+from groups import DEFECT_A, DEFECT_B, GROUPS
+from summaries import parse_capture_name, read_columns
+
+RESULTS_DIR = "processed_results"
+# Component detections aren't defects; only the defect groups are counted
+SUMMARY_DIRS = [os.path.join(RESULTS_DIR, GROUPS[key].subdir) for key in (DEFECT_A, DEFECT_B)]
+# Next to history.db rather than among the summaries it indexes
+ANALYTICS_DB = os.path.join(HISTORY_DIR, "analytics.db")
+HISTOGRAM_BINS = 10
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ingested_files (
+    path TEXT PRIMARY KEY,
+    email TEXT,
+    timestamp INTEGER
+);
+CREATE TABLE IF NOT EXISTS scanned_dirs (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    subdirs TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS daily_counts (
+    day TEXT NOT NULL,
+    email TEXT NOT NULL,
+    class TEXT NOT NULL,
+    detections INTEGER NOT NULL,
+    captures INTEGER NOT NULL,
+    confidence_sum REAL NOT NULL,
+    PRIMARY KEY (day, email, class)
+);
+CREATE INDEX IF NOT EXISTS idx_daily_email ON daily_counts (email, day);
+CREATE INDEX IF NOT EXISTS idx_daily_class ON daily_counts (class, day);
+CREATE TABLE IF NOT EXISTS daily_captures (
+    day TEXT NOT NULL,
+    email TEXT NOT NULL,
+    captures INTEGER NOT NULL,
+    PRIMARY KEY (day, email)
+);
+CREATE TABLE IF NOT EXISTS confidence_bins (
+    email TEXT NOT NULL,
+    class TEXT NOT NULL,
+    bin INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (email, class, bin)
+);
+"""
+
+
+def _parse_name(filename):
+    """(email, unix time) from summary_<capture name>.<json|npz>, for summaries that predate those fields."""
+    return parse_capture_name(os.path.splitext(filename)[0][len("summary_"):])
+
+
+def known_classes():
+    """Full defect class names of both defect groups, in letter order."""
+    return [full for key in (DEFECT_A, DEFECT_B) for _, full in sorted(GROUPS[key].class_map.values())]
+
+
+class DefectAnalytics:
+    """Incremental summary index plus aggregate queries."""
+    def __init__(self, db_path: str = ANALYTICS_DB):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._ingest_lock = threading.Lock()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    # ---------------- Ingestion ----------------
+    def ingest(self, roots=None) -> int:
+        """Index summaries under `roots` (default SUMMARY_DIRS) not seen before. Returns how many were added."""
+        roots = [os.path.normpath(root) for root in (roots or SUMMARY_DIRS) if os.path.isdir(root)]
+        if not roots:
+            return 0
+
+        with self._ingest_lock:
+            conn = self._conn()
+            known_dirs = {path: (mtime, json.loads(subdirs)) for path, mtime, subdirs
+                          in conn.execute("SELECT path, mtime_ns, subdirs FROM scanned_dirs")}
+            added = 0
+            stack = roots
+            while stack:
+                directory = stack.pop()
+                try:
+                    mtime = os.stat(directory).st_mtime_ns
+                except OSError:
+                    continue
+
+                known = known_dirs.get(directory)
+                if known and known[0] == mtime:
+                    # Nothing added or removed here; only its subdirectories can have changed
+                    stack.extend(known[1])
+                    continue
+
+                subdirs, candidates = [], []
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir():
+                            subdirs.append(entry.path)
+                        elif entry.name.startswith("summary_") and entry.name.endswith((".json", ".npz")):
+                            candidates.append(entry.path)
+
+                unreadable = False
+                with conn:
+                    for path in candidates:
+                        result = self._ingest_file(conn, path)
+                        added += result is True
+                        unreadable |= result is None
+                    # A file that couldn't be read must be retried even if the dir doesn't change again
+                    if not unreadable:
+                        conn.execute("INSERT OR REPLACE INTO scanned_dirs (path, mtime_ns, subdirs) "
+                                     "VALUES (?, ?, ?)", (directory, mtime, json.dumps(subdirs)))
+                stack.extend(subdirs)
+            return added
+
+    def _ingest_file(self, conn, path: str):
+        """True if indexed now, False if already indexed, None if unreadable."""
+        if conn.execute("SELECT 1 FROM ingested_files WHERE path = ?", (path,)).fetchone():
+            return False
+
+        try:
+            meta, _, classes, confidence, _ = read_columns(path)
+            # Capture time, not when the summary was written (batch re-inspection writes them all at once)
+            email, timestamp = meta.get("email"), meta.get("captured")
+            if not email or not timestamp:
+                name_email, name_ts = _parse_name(os.path.basename(path))
+                email = email or name_email
+                timestamp = timestamp or name_ts or meta.get("created") or os.path.getmtime(path)
+            timestamp = int(timestamp)
+        except Exception:
+            return None  # unreadable (e.g. corrupt); the next scan tries again
+        email = email or ""
+
+        day = time.strftime("%Y-%m-%d", time.localtime(timestamp))
+        conn.execute("INSERT INTO ingested_files (path, email, timestamp) VALUES (?, ?, ?)",
+                     (path, email, timestamp))
+        conn.execute("INSERT INTO daily_captures (day, email, captures) VALUES (?, ?, 1) "
+                     "ON CONFLICT (day, email) DO UPDATE SET captures = captures + 1", (day, email))
+
+        per_class, bins = {}, {}
+        for cls, conf in zip(classes.tolist(), confidence.tolist()):
+            count, conf_sum = per_class.get(cls, (0, 0.0))
+            per_class[cls] = (count + 1, conf_sum + conf)
+            b = min(int(conf * HISTOGRAM_BINS), HISTOGRAM_BINS - 1)
+            bins[(cls, b)] = bins.get((cls, b), 0) + 1
+
+        conn.executemany(
+            "INSERT INTO daily_counts (day, email, class, detections, captures, confidence_sum) "
+            "VALUES (?, ?, ?, ?, 1, ?) ON CONFLICT (day, email, class) DO UPDATE SET "
+            "detections = detections + excluded.detections, captures = captures + 1, "
+            "confidence_sum = confidence_sum + excluded.confidence_sum",
+            [(day, email, cls, count, conf_sum) for cls, (count, conf_sum) in per_class.items()])
+        conn.executemany(
+            "INSERT INTO confidence_bins (email, class, bin, count) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (email, class, bin) DO UPDATE SET count = count + excluded.count",
+            [(email, cls, b, count) for (cls, b), count in bins.items()])
+        return True
+
+    # ---------------- Queries ----------------
+    @staticmethod
+    def _filters(email=None, since=None, until=None, defect_class=None):
+        """WHERE clause for daily tables; since/until are YYYY-MM-DD (inclusive)."""
+        clauses, params = [], []
+        for column, op, value in (("email", "=", email), ("day", ">=", since),
+                                  ("day", "<=", until), ("class", "=", defect_class)):
+            if value is not None:
+                clauses.append(f"{column} {op} ?")
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def counts_per_class(self, email=None, since=None, until=None):
+        """{class: detections}, including zero rows for every known defect class."""
+        where, params = self._filters(email, since, until)
+        counts = {cls: 0 for cls in known_classes()}
+        for cls, total in self._conn().execute(
+                f"SELECT class, SUM(detections) FROM daily_counts{where} GROUP BY class", params):
+            counts[cls] = total
+        return counts
+
+    def daily_counts(self, email=None, defect_class=None, since=None, until=None):
+        """[(day, detections)] oldest first -- the trend line for one class or all."""
+        where, params = self._filters(email, since, until, defect_class)
+        return list(self._conn().execute(
+            f"SELECT day, SUM(detections) FROM daily_counts{where} GROUP BY day ORDER BY day", params))
+
+    def counts_per_day_per_user(self, defect_class=None, since=None, until=None):
+        """[(day, email, detections)] -- e.g. short circuits per day per user."""
+        where, params = self._filters(None, since, until, defect_class)
+        return list(self._conn().execute(
+            f"SELECT day, email, SUM(detections) FROM daily_counts{where} "
+            "GROUP BY day, email ORDER BY day, email", params))
+
+    def captures(self, email=None, since=None, until=None):
+        """Number of ingested captures."""
+        where, params = self._filters(email, since, until)
+        row = self._conn().execute(f"SELECT SUM(captures) FROM daily_captures{where}", params).fetchone()
+        return row[0] or 0
+
+    def confidence_histogram(self, email=None, defect_class=None):
+        """Detection counts in HISTOGRAM_BINS equal confidence bins from 0 to 1."""
+        where, params = self._filters(email, None, None, defect_class)
+        histogram = [0] * HISTOGRAM_BINS
+        for b, count in self._conn().execute(
+                f"SELECT bin, SUM(count) FROM confidence_bins{where} GROUP BY bin", params):
+            histogram[b] = count
+        return histogram
+
+    def report(self, email=None, days: int = 14) -> str:
+        """Plain-text overview used by the Profile page and the CLI."""
+        since = time.strftime("%Y-%m-%d", time.localtime(time.time() - (days - 1) * 86400))
+        lines = [f"Captures analysed: {self.captures(email)}", "", "Defects by class:"]
+        for cls, count in self.counts_per_class(email).items():
+            lines.append(f"  {cls:<20} {count}")
+
+        lines += ["", f"Last {days} days:"]
+        trend = self.daily_counts(email, since=since)
+        if trend:
+            peak = max(count for _, count in trend) or 1
+            for day, count in trend:
+                lines.append(f"  {day}  {'#' * max(1, round(count * 30 / peak)) if count else ''} {count}")
+        else:
+            lines.append("  no captures")
+
+        lines += ["", "Confidence histogram:"]
+        histogram = self.confidence_histogram(email)
+        peak = max(histogram) or 1
+        for b, count in enumerate(histogram):
+            low = b / HISTOGRAM_BINS
+            lines.append(f"  {low:.1f}-{low + 1 / HISTOGRAM_BINS:.1f}  "
+                         f"{'#' * round(count * 30 / peak) if count else ''} {count}")
+        return "\n".join(lines)
+
+
+# Shared instance used by the Profile page
+analytics = DefectAnalytics()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Index stored summaries and print defect analytics.")
+    parser.add_argument("roots", nargs="*", default=SUMMARY_DIRS,
+                        help=f"summary directories (default: {' '.join(SUMMARY_DIRS)})")
+    parser.add_argument("--user", help="only this user's captures (email)")
+    parser.add_argument("--days", type=int, default=14, help="days in the trend section (default: 14)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    added = analytics.ingest(args.roots)
+    print(f"Indexed {added} new summaries in {time.perf_counter() - started:.1f}s\n")
+    print(analytics.report(args.user, days=args.days))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,14 +1,29 @@
+import importlib
+import threading
 import tkinter as tk
 from auth import AuthManager
-from pages.home import Home
-from pages.register import Register
-from pages.profile import Profile
-from pages.about import About
-from pages.defecta import DefectA
-from pages.defectb import DefectB
-from pages.components import Components
-from pages.results import DefectResult
-from pages.loading import LoadingPage
+from pages.diagnostics import DiagnosticsWindow
+from metrics import METRICS_DIR, metrics
+from scheduler import InferenceScheduler
+from startup_profile import profile
+
+# Page name -> (module, class). A page's module is imported and the frame
+# built the first time it is shown, so cv2/PIL/customtkinter only load once
+# a page that needs them is opened.
+PAGES = {
+    "Home": ("pages.home", "Home"),
+    "About": ("pages.about", "About"),
+    "Register": ("pages.register", "Register"),
+    "Profile": ("pages.profile", "Profile"),
+    "DefectA": ("pages.defecta", "DefectA"),
+    "DefectB": ("pages.defectb", "DefectB"),
+    "Components": ("pages.components", "Components"),
+    "DefectResult": ("pages.results", "DefectResult"),
+    "LoadingPage": ("pages.loading", "LoadingPage"),
+}
+
+# Delay before importing predict and loading weights, so the login screen paints first
+WARM_UP_DELAY_MS = 500
 
 
 class VisionBoard(tk.Tk):
@@ -17,6 +32,8 @@ class VisionBoard(tk.Tk):
         self.geometry("1500x900")
         self.title("VisionBoard")
         self.auth = AuthManager()
+        # Single queue for model work: at most one job running and one waiting
+        self.scheduler = InferenceScheduler(self, max_pending=1, policy=InferenceScheduler.COALESCE)
 
         # === HEADER BAR ===
         header_frame = tk.Frame(self, bg="#0D3E5B")
@@ -42,22 +59,14 @@ class VisionBoard(tk.Tk):
         self.nav_color_active = "#00FFFF"
 
         # === PAGE CONTAINER ===
-        container = tk.Frame(self)
-        container.pack(side="top", fill="both", expand=True)
-        container.grid_rowconfigure(0, weight=1)
-        container.grid_columnconfigure(0, weight=1)
+        self.container = tk.Frame(self)
+        self.container.pack(side="top", fill="both", expand=True)
+        self.container.grid_rowconfigure(0, weight=1)
+        self.container.grid_columnconfigure(0, weight=1)
 
-        # === INITIALIZE PAGES ===
+        # === PAGES (built on first use, see get_frame) ===
         self.frames = {}
-        for F in (
-            Home, About, Register, Profile,
-            DefectA, DefectB, Components,
-            DefectResult, LoadingPage
-        ):
-            page_name = F.__name__
-            frame = F(parent=container, controller=self)
-            self.frames[page_name] = frame
-            frame.grid(row=0, column=0, sticky="nsew")
+        self.active_page = None
 
         # Setup initial navigation (before login → Home + About)
         self.rebuild_nav([("Home", "Home"), ("About", "About")])
@@ -65,6 +74,17 @@ class VisionBoard(tk.Tk):
         # Start at Home
         self.show_frame("Home")
 
+        # Load model weights in the background once the login screen is up
+        # (the startup profiler loads it itself, so its timings stay separate)
+        if not profile.enabled:
+            self.after(WARM_UP_DELAY_MS, self._warm_up_model)
+
+        # F12 opens the timing diagnostics; VISIONBOARD_METRICS_DIR enables periodic export
+        self.diagnostics = None
+        self.bind_all("<F12>", lambda e: self.show_diagnostics())
+        if METRICS_DIR:
+            metrics.start_exporter(METRICS_DIR)
+
     # ---------------- NAV HELPERS ----------------
     def create_nav_label(self, text, page_name):
         """Create and store a single nav label in nav_frame."""
@@ -94,13 +114,8 @@ class VisionBoard(tk.Tk):
             self.create_nav_label(text, page_name)
 
         # Highlight current page if it exists
-        cur = None
-        for page in self.frames:
-            if self.frames[page].winfo_ismapped():
-                cur = page
-                break
-        if cur:
-            self._update_nav_active(cur)
+        if self.active_page:
+            self._update_nav_active(self.active_page)
 
     def enable_post_login_nav(self):
         """After login → Profile + About"""
@@ -112,17 +127,44 @@ class VisionBoard(tk.Tk):
         self.rebuild_nav([("Home", "Home"), ("About", "About")])
         self.show_frame("Home")
 
+    def _warm_up_model(self):
+        """Import predict (cv2, numpy, ultralytics) and start loading weights off the Tk thread."""
+        def _load():
+            from predict import warm_up_model
+            warm_up_model()
+
+        threading.Thread(target=_load, name="model-warm-up", daemon=True).start()
+
+    def show_diagnostics(self):
+        """Open the diagnostics window, or raise it if already open."""
+        if self.diagnostics is None or not self.diagnostics.winfo_exists():
+            self.diagnostics = DiagnosticsWindow(self)
+        self.diagnostics.lift()
+
     # ---------------- PAGE NAVIGATION ----------------
+    def get_frame(self, page_name):
+        """Return the page, importing its module and building it on first use."""
+        frame = self.frames.get(page_name)
+        if frame is None:
+            module_name, class_name = PAGES[page_name]
+            # Timed with --profile-startup: module import plus constructor
+            with profile.timed(f"page {page_name}"):
+                page_class = getattr(importlib.import_module(module_name), class_name)
+                frame = page_class(parent=self.container, controller=self)
+                frame.grid(row=0, column=0, sticky="nsew")
+            self.frames[page_name] = frame
+        return frame
+
     def show_frame(self, page_name):
-        """Raise the page and call lifecycle hooks."""
-        for f in self.frames.values():
-            if hasattr(f, "on_hide"):
-                try:
-                    f.on_hide()
-                except Exception:
-                    pass
+        """Raise the page and call lifecycle hooks (on_hide only for the page being left)."""
+        outgoing = self.frames.get(self.active_page)
+        if outgoing is not None and self.active_page != page_name and hasattr(outgoing, "on_hide"):
+            try:
+                outgoing.on_hide()
+            except Exception:
+                pass
 
-        frame = self.frames[page_name]
+        frame = self.get_frame(page_name)
 
         if page_name == "Register" and hasattr(frame, "reset_fields"):
             frame.reset_fields()
@@ -132,6 +174,7 @@ class VisionBoard(tk.Tk):
             frame.on_show()
 
         frame.tkraise()
+        self.active_page = page_name
         self._update_nav_active(page_name)
 
     def _update_nav_active(self, active_page):
@@ -1,62 +1,125 @@
-from db import load_user_data, save_user_data, hash_password
+import hashlib
+import hmac
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from db import user_store, hash_password, needs_rehash, verify_password
+
+# How long a successful login lets the same credentials back in without the KDF
+SESSION_TTL_S = 12 * 60 * 60
+
+
+class CredentialCache:
+    """
+    Remembers credentials that passed the slow KDF during this process, so
+    logging back in within a shift is an HMAC instead of a full scrypt.
+    Entries hold an HMAC keyed with a per-process random secret (never the
+    password), are tied to the stored hash they were verified against, and
+    expire after `ttl` seconds. Nothing is written to disk.
+    """
+    def __init__(self, ttl: float = SESSION_TTL_S):
+        self.ttl = ttl
+        self._key = os.urandom(32)
+        self._entries = {}  # email -> (tag, stored_hash, expires)
+        self._lock = threading.Lock()
+
+    def _tag(self, email, password):
+        return hmac.new(self._key, f"{email}\0{password}".encode(), hashlib.sha256).digest()
+
+    def remember(self, email, password, stored_hash):
+        with self._lock:
+            self._entries[email] = (self._tag(email, password), stored_hash, time.monotonic() + self.ttl)
+
+    def check(self, email, password, stored_hash):
+        """True if these exact credentials were verified against `stored_hash` and haven't expired."""
+        with self._lock:
+            entry = self._entries.get(email)
+        if entry is None:
+            return False
+        tag, cached_hash, expires = entry
+        if cached_hash != stored_hash or time.monotonic() > expires:
+            self.forget(email)
+            return False
+        return hmac.compare_digest(tag, self._tag(email, password))
+
+    def forget(self, email):
+        with self._lock:
+            self._entries.pop(email, None)
+
 
 class AuthManager:
     def __init__(self):
         self.is_logged_in = False
         self.current_user = None
+        self.users = user_store
+        self.credentials = CredentialCache()
+        # Password hashing is slow on purpose; pages use the *_async methods to keep Tk responsive
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="auth")
+        # Throwaway hash that unknown users are "checked" against, so they take as
+        # long to reject as known ones; built in the background, ready before the
+        # first login queued behind it
+        self._dummy_hash = self._executor.submit(hash_password, os.urandom(16).hex())
 
     def login(self, identifier, password):
         """
         identifier can be either email OR username.
+        Blocks for the KDF unless the credentials are cached; prefer login_async() from the UI.
         """
-        users = load_user_data()
-        hashed_password = hash_password(password)
-
-        # 1. Try direct email login
-        if identifier in users:
-            if users[identifier]["password"] == hashed_password:
-                self.is_logged_in = True
-                self.current_user = {"email": identifier, **users[identifier]}
-                return True
+        email, user_data = self.users.find(identifier)
+        if email is None:
+            # Don't reveal which identifiers exist by answering faster
+            verify_password(password, self._dummy_hash.result())
             return False
 
-        # 2. Otherwise, search by username
-        for email, user_data in users.items():
-            if user_data.get("username") == identifier and user_data["password"] == hashed_password:
-                self.is_logged_in = True
-                self.current_user = {"email": email, **user_data}
-                return True
+        stored = user_data.get("password", "")
+        if not self.credentials.check(email, password, stored):
+            if not verify_password(password, stored):
+                return False
+            if needs_rehash(stored):
+                # Legacy SHA-256 (or old parameters): re-hash now that we know the password
+                stored = hash_password(password)
+                self.users.update(email, {"password": stored})
+                user_data = {**user_data, "password": stored}
+            self.credentials.remember(email, password, stored)
 
-        return False
+        self.is_logged_in = True
+        self.current_user = {"email": email, **user_data}
+        return True
+
+    def login_async(self, identifier, password):
+        """Run login() on the auth worker. Returns a Future resolving to True/False."""
+        return self._executor.submit(self.login, identifier, password)
 
     def logout(self):
         self.is_logged_in = False
         self.current_user = None
 
     def register(self, username, email, password, user_type):
-        users = load_user_data()
-
         # Ensure unique email
-        if email in users:
+        if self.users.email_exists(email):
             return False, "Email already exists."
 
         # Ensure unique username
-        for u in users.values():
-            if u.get("username") == username:
-                return False, "Username already taken."
+        if self.users.username_exists(username):
+            return False, "Username already taken."
 
         # Save new user
-        users[email] = {
+        stored = hash_password(password)
+        self.users.add(email, {
             "username": username,
-            "password": hash_password(password),
+            "password": stored,
             "user_type": user_type
-        }
-        save_user_data(users)
+        })
+        self.credentials.remember(email, password, stored)
         return True, "Registration successful!"
 
+    def register_async(self, username, email, password, user_type):
+        """Run register() on the auth worker. Returns a Future resolving to (success, message)."""
+        return self._executor.submit(self.register, username, email, password, user_type)
+
     def delete_account(self):
         if self.current_user:
-            users = load_user_data()
-            del users[self.current_user["email"]]
-            save_user_data(users)
+            self.credentials.forget(self.current_user["email"])
+            self.users.remove(self.current_user["email"])
             self.logout()
@@ -0,0 +1,186 @@
+"""
+Headless batch inspection of saved board images.
+
+    python batch_inspect.py archive/2025-06/ --output reinspect --workers 4
+    python batch_inspect.py "captured_images/defectA/*.jpg"
+    python batch_inspect.py boards/ --group components
+
+Writes processed images and summary JSON with the same layout the app
+uses (for group A: processed_results/processed_<name>, processed_results/
+defectA/summary_<name>.json|.npz) under --output, then prints throughput stats.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from groups import DEFAULT_GROUP, GROUPS, get_group
+from inference_pool import InferencePool
+from metrics import metrics
+from predict import DEFAULT_BATCH_SIZE, analyze_image, analyze_images
+from summaries import from_analysis, parse_capture_name, summary_extension, write_summary
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def find_images(source: str, recursive: bool = False):
+    """Image files in a directory, or matching a glob pattern, sorted."""
+    if os.path.isdir(source):
+        pattern = os.path.join(source, "**", "*") if recursive else os.path.join(source, "*")
+    else:
+        pattern = source
+    paths = glob.glob(pattern, recursive=recursive)
+    return sorted(p for p in paths if os.path.isfile(p) and p.lower().endswith(IMAGE_EXTENSIONS))
+
+
+def output_names(paths):
+    """
+    Flat output name per path: its path below the images' common folder,
+    with separators replaced by "__" (01/board.jpg, 02/board.jpg ->
+    01__board.jpg, 02__board.jpg), so same-named files in different
+    folders of a --recursive run don't overwrite each other. Plain basenames when all
+    images share one folder.
+    """
+    if not paths:
+        return []
+    base = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in paths])
+    return [os.path.relpath(os.path.abspath(p), base).replace(os.sep, "__") for p in paths]
+
+
+def _write_summary(summary_dir: str, name: str, summary: dict, binary=None) -> None:
+    """
+    Same file the app writes per capture (versioned JSON, or .npz when
+    large/forced). User and capture time come from an archived capture's
+    <email>_<ts> name, else the capture time is the image's mtime.
+    """
+    detections = summary.get("detections", [])
+    path = os.path.join(summary_dir, f"summary_{name}{summary_extension(detections, binary)}")
+    email, captured = parse_capture_name(os.path.basename(summary["file"]))
+    if captured is None:
+        captured = int(os.path.getmtime(summary["file"]))
+    write_summary(path, from_analysis(summary, email=email, captured=captured))
+
+
+def _inspect_chunk(paths, names, save_dir, summary_dir, batch_size, show_confidence, pool=None,
+                   binary=None, group=None):
+    """Worker job: analyze one chunk, saving paths[i] as names[i]. Returns (ok_count, detection_count, failures)."""
+    try:
+        if pool is not None:
+            # Inference happens in the pool's processes; this thread decodes, draws and saves
+            outputs = [analyze_image(path, save_dir=save_dir, show_confidence=show_confidence, name=name,
+                                     detector=pool.detect, group=group) for path, name in zip(paths, names)]
+        else:
+            outputs = analyze_images(paths, save_dir=save_dir, show_confidence=show_confidence,
+                                     batch_size=batch_size, names=names, group=group)
+        saved = list(zip(names, outputs))
+    except Exception:
+        # One bad file fails the whole batch; retry one by one to isolate it
+        saved, failures = [], []
+        for path, name in zip(paths, names):
+            try:
+                saved.append((name, analyze_image(path, save_dir=save_dir, show_confidence=show_confidence,
+                                                  name=name, detector=pool.detect if pool else None,
+                                                  group=group)))
+            except Exception as e:
+                failures.append((path, str(e)))
+    else:
+        failures = []
+
+    ok = detections = 0
+    for name, (_, summary) in saved:
+        try:
+            _write_summary(summary_dir, name, summary, binary)
+        except OSError as e:
+            failures.append((summary["file"], f"summary not written: {e}"))
+            continue
+        ok += 1
+        detections += len(summary.get("detections", []))
+    return ok, detections, failures
+
+
+def run(paths, output: str = ".", workers: int = 2, batch_size: int = DEFAULT_BATCH_SIZE,
+        show_confidence: bool = False, processes: int = 0, binary=None, group: str = DEFAULT_GROUP) -> dict:
+    """
+    Inspect `paths` with `group`'s model using a worker pool. With
+    `processes` > 0, inference runs in that many model processes and
+    `workers` threads feed them. Returns throughput stats.
+    """
+    inspection = get_group(group)
+    save_dir = os.path.join(output, inspection.processed_dir)
+    summary_dir = os.path.join(output, "processed_results", inspection.subdir)
+    os.makedirs(save_dir, exist_ok=True)
+    os.makedirs(summary_dir, exist_ok=True)
+
+    names = output_names(paths)
+    chunks = [(paths[i:i + batch_size], names[i:i + batch_size]) for i in range(0, len(paths), batch_size)]
+    stats = {"images": 0, "detections": 0, "failed": [], "seconds": 0.0}
+
+    inference_pool = InferencePool(processes, model_path=inspection.model_path) if processes > 0 else None
+    if inference_pool is not None:
+        workers = max(workers, processes)  # enough feeders to keep every process busy
+
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            jobs = [pool.submit(_inspect_chunk, chunk, chunk_names, save_dir, summary_dir, batch_size,
+                                show_confidence, inference_pool, binary, group)
+                    for chunk, chunk_names in chunks]
+            for job in as_completed(jobs):
+                ok, detections, failures = job.result()
+                stats["images"] += ok
+                stats["detections"] += detections
+                stats["failed"].extend(failures)
+                print(f"\r{stats['images'] + len(stats['failed'])}/{len(paths)} images", end="", flush=True)
+    finally:
+        if inference_pool is not None:
+            inference_pool.close()
+    stats["seconds"] = time.perf_counter() - started
+    print()
+    return stats
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect a directory (or glob) of board images without the GUI.")
+    parser.add_argument("source", help="directory of images, or a quoted glob pattern")
+    parser.add_argument("-o", "--output", default=".", help="root for processed_results/ (default: current dir)")
+    parser.add_argument("-w", "--workers", type=int, default=2, help="worker threads (default: 2)")
+    parser.add_argument("-b", "--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"images per model call (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("-p", "--processes", type=int, default=0,
+                        help="run inference in N model processes (default: 0, in-process)")
+    parser.add_argument("-g", "--group", choices=sorted(GROUPS), default=DEFAULT_GROUP,
+                        help=f"inspection group / model to use (default: {DEFAULT_GROUP})")
+    parser.add_argument("-r", "--recursive", action="store_true", help="descend into subdirectories")
+    parser.add_argument("--binary", dest="binary", action="store_true", default=None,
+                        help="always write .npz summaries (default: only for large detection sets)")
+    parser.add_argument("--show-confidence", action="store_true", help="print confidence on annotations")
+    parser.add_argument("--metrics", metavar="DIR",
+                        help="write per-stage timings (Prometheus text + JSONL) into DIR when done")
+    args = parser.parse_args(argv)
+
+    paths = find_images(args.source, recursive=args.recursive)
+    if not paths:
+        print(f"No images found in {args.source}", file=sys.stderr)
+        return 1
+
+    stats = run(paths, output=args.output, workers=args.workers, batch_size=args.batch_size,
+                show_confidence=args.show_confidence, processes=args.processes, binary=args.binary,
+                group=args.group)
+
+    rate = stats["images"] / stats["seconds"] if stats["seconds"] else 0.0
+    print(f"Inspected {stats['images']} images in {stats['seconds']:.1f}s "
+          f"({rate:.2f} images/s, {stats['seconds'] / max(stats['images'], 1) * 1000:.0f} ms/image)")
+    print(f"Detections: {stats['detections']}")
+    for stage, s in metrics.snapshot().items():
+        print(f"  {stage:<11} p50 {s['p50']:8.1f} ms  p95 {s['p95']:8.1f} ms  p99 {s['p99']:8.1f} ms")
+    if args.metrics:
+        metrics.export(args.metrics)
+    for path, error in stats["failed"]:
+        print(f"FAILED {path}: {error}", file=sys.stderr)
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+import cv2
+
+from metrics import metrics
+
+
+class CameraService:
+    """
+    Owns one cv2.VideoCapture and reads it on a dedicated thread into a
+    small ring buffer. Pages call latest() from the Tk thread and never
+    block on the device.
+
+    Frames handed out are shared between pages: treat them as read-only
+    and copy before drawing on them.
+    """
+    def __init__(self, index: int = 0, backend: Optional[int] = None,
+                 width: Optional[int] = None, height: Optional[int] = None,
+                 fps: Optional[int] = None, buffer_len: int = 2):
+        self.index = index
+        self.backend = backend
+        self.width = width
+        self.height = height
+        self.fps = fps
+
+        self._cap: Optional[cv2.VideoCapture] = None
+        self._buffer = deque(maxlen=buffer_len)  # (frame_id, frame)
+        self._frame_id = 0
+        self._running = False
+        self._stop: Optional[threading.Event] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def open(self) -> bool:
+        """Open the device and start the reader thread. Returns False if no camera."""
+        if self._running:
+            return True
+
+        if self.backend is None:
+            cap = cv2.VideoCapture(self.index)
+        else:
+            cap = cv2.VideoCapture(self.index, self.backend)
+
+        if not cap.isOpened():
+            cap.release()
+            return False
+
+        # Keep the driver queue as short as possible so reads return fresh frames
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        if self.width:
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        if self.height:
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        if self.fps:
+            cap.set(cv2.CAP_PROP_FPS, self.fps)
+
+        self._cap = cap
+        self._running = True
+        # Each reader gets its own stop event, so one still stuck in read()
+        # after close() can't pick up a device opened later
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._reader, args=(cap, self._stop),
+                                        name=f"camera-{self.index}", daemon=True)
+        self._thread.start()
+        return True
+
+    def _reader(self, cap, stop: threading.Event) -> None:
+        """
+        Reader thread: push every successfully read frame into the ring
+        buffer. The thread owns `cap` and releases it on exit, so the device
+        is never released while a read() is still blocked in the driver.
+        """
+        try:
+            while not stop.is_set():
+                started = time.perf_counter()
+                ret, frame = cap.read()
+                if stop.is_set():
+                    break
+                if not ret:
+                    time.sleep(0.01)  # device hiccup; don't spin
+                    continue
+                # Includes waiting for the device, so it tracks the delivered frame interval
+                metrics.record("capture", (time.perf_counter() - started) * 1000)
+                self._frame_id += 1
+                self._buffer.append((self._frame_id, frame))
+        finally:
+            try:
+                cap.release()
+            except Exception:
+                pass
+
+    def latest(self):
+        """Return (frame_id, frame) for the newest frame, or (0, None) if none yet."""
+        try:
+            return self._buffer[-1]
+        except IndexError:
+            return 0, None
+
+    def is_opened(self) -> bool:
+        return self._running
+
+    def close(self) -> None:
+        """
+        Stop the reader thread; it releases the device when its current
+        read() returns (up to the driver's timeout for an unplugged camera).
+        """
+        self._running = False
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self._cap = None
+        self._buffer.clear()
+
+
+# ---------------- Shared instances ----------------
+# One CameraService per device index, reference counted across pages.
+_cameras = {}
+_refcounts = {}
+_close_timers = {}
+_lock = threading.Lock()
+
+# Seconds an unused camera stays open, so hopping between the camera pages
+# doesn't pay the device open (~1 s on V4L2) again. 0 closes immediately.
+CAMERA_LINGER_S = float(os.environ.get("VISIONBOARD_CAMERA_LINGER", "5"))
+
+
+def acquire_camera(index: int = 0, **settings) -> Optional[CameraService]:
+    """
+    Return the shared camera for `index`, opening it on first use.
+    `settings` (backend, width, height, fps) only apply when the device is
+    opened; later callers share whatever is already running.
+    Returns None if the camera can't be opened.
+    """
+    with _lock:
+        timer = _close_timers.pop(index, None)
+        if timer is not None:
+            timer.cancel()  # still lingering from the last page: reuse it
+        camera = _cameras.get(index)
+        if camera is None:
+            camera = CameraService(index, **settings)
+            if not camera.open():
+                return None
+            _cameras[index] = camera
+            _refcounts[index] = 0
+        _refcounts[index] += 1
+        return camera
+
+
+def release_camera(camera: Optional[CameraService], linger: Optional[float] = None) -> None:
+    """
+    Drop one reference to `camera`. When nobody uses it any more the device
+    closes after `linger` seconds (default CAMERA_LINGER_S) unless it is
+    acquired again first.
+    """
+    if camera is None:
+        return
+    linger = CAMERA_LINGER_S if linger is None else linger
+    with _lock:
+        index = camera.index
+        if _cameras.get(index) is not camera:
+            return
+        _refcounts[index] -= 1
+        if _refcounts[index] > 0:
+            return
+        if linger > 0:
+            timer = threading.Timer(linger, _close_if_unused, args=(camera,))
+            timer.daemon = True
+            _close_timers[index] = timer
+            timer.start()
+            return
+        del _cameras[index]
+        del _refcounts[index]
+    camera.close()
+
+
+def _close_if_unused(camera: CameraService) -> None:
+    """Linger timer: close the camera unless someone acquired it meanwhile."""
+    with _lock:
+        index = camera.index
+        if _cameras.get(index) is not camera or _refcounts.get(index):
+            return
+        _close_timers.pop(index, None)
+        del _cameras[index]
+        del _refcounts[index]
+    camera.close()
@@ -1,70 +1,450 @@
+import base64
+import hashlib
+import hmac
 import json
 import os
-import hashlib
+import sqlite3
+import tempfile
+import threading
+from summaries import read_detections
 
 USERS_FILE = "users.json"
 HISTORY_DIR = "user_history"  # directory to store per-user history JSON files
 
-def load_user_data():
-    if os.path.exists(USERS_FILE):
-        with open(USERS_FILE, "r") as f:
-            return json.load(f)
-    return {}
 
-def save_user_data(data):
-    with open(USERS_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+# -------------------- Persistence helpers --------------------
+def atomic_write_json(path, data, indent=4):
+    """
+    Write JSON to a temp file in the same directory, fsync it, then rename
+    over `path`. Readers see either the old file or the new one, never a
+    half-written file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_", suffix=".json")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def read_json_lines(path):
+    """Records from a legacy JSON-lines history file; a torn last line (crash mid-append) is skipped."""
+    records = []
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    return records
+
+
+# -------------------- Password hashing --------------------
+# Stored as "scrypt$n$r$p$salt$hash" (base64 salt/hash). pbkdf2_sha256 is the
+# fallback where OpenSSL lacks scrypt. Bare 64-char hex strings are legacy
+# unsalted SHA-256 hashes; they still verify and are upgraded on login.
+SCRYPT_N, SCRYPT_R, SCRYPT_P = 2 ** 17, 8, 1
+SCRYPT_MAXMEM = 256 * 1024 * 1024  # N=2**17, r=8 needs 128 MiB; OpenSSL's default cap is 32 MiB
+PBKDF2_ITERATIONS = 600_000
+SALT_BYTES = 16
+
+
+def _b64(raw):
+    return base64.b64encode(raw).decode("ascii")
+
 
 def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
+    """Salted, deliberately slow hash (about 0.6 s and 128 MiB for scrypt); keep it off the Tk thread."""
+    salt = os.urandom(SALT_BYTES)
+    if hasattr(hashlib, "scrypt"):
+        digest = hashlib.scrypt(password.encode(), salt=salt, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P,
+                                maxmem=SCRYPT_MAXMEM)
+        return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(digest)}"
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, PBKDF2_ITERATIONS)
+    return f"pbkdf2_sha256${PBKDF2_ITERATIONS}${_b64(salt)}${_b64(digest)}"
 
 
-# -------------------- User History --------------------
-def load_user_history(email):
+def verify_password(password, stored):
+    """True if `password` matches `stored` (any supported format, including legacy SHA-256)."""
+    if not stored:
+        return False
+    parts = stored.split("$")
+    try:
+        if parts[0] == "scrypt" and len(parts) == 6:
+            n, r, p = (int(x) for x in parts[1:4])
+            salt, expected = base64.b64decode(parts[4]), base64.b64decode(parts[5])
+            digest = hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                                    maxmem=SCRYPT_MAXMEM, dklen=len(expected))
+        elif parts[0] == "pbkdf2_sha256" and len(parts) == 4:
+            salt, expected = base64.b64decode(parts[2]), base64.b64decode(parts[3])
+            digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, int(parts[1]),
+                                         dklen=len(expected))
+        elif len(parts) == 1:
+            expected = stored.encode()
+            digest = hashlib.sha256(password.encode()).hexdigest().encode()
+        else:
+            return False
+    except (ValueError, TypeError):
+        return False  # corrupt entry
+    return hmac.compare_digest(digest, expected)
+
+
+def needs_rehash(stored):
+    """True for legacy hashes and ones made with weaker parameters than today's."""
+    if hasattr(hashlib, "scrypt"):
+        return stored.split("$")[:4] != ["scrypt", str(SCRYPT_N), str(SCRYPT_R), str(SCRYPT_P)]
+    return stored.split("$")[:2] != ["pbkdf2_sha256", str(PBKDF2_ITERATIONS)]
+
+
+class UserStore:
     """
-    Load a list of the user's past detections.
-    Each entry: {"name": ..., "image_path": ..., "summary_path": ..., "timestamp": ...}
-    Remove entries where the image or summary file is missing.
+    users.json with email and username indexes kept in memory.
+    The file is only re-read when its mtime/size change (e.g. edited by
+    another process), so lookups are O(1) dict hits.
     """
-    history_file = os.path.join(HISTORY_DIR, f"{email}.json")
-    valid_history = []
+    def __init__(self, path=USERS_FILE):
+        self.path = path
+        self._users = {}
+        self._by_username = {}
+        self._stamp = None
+        self._lock = threading.Lock()
 
-    if os.path.exists(history_file):
+    def _file_stamp(self):
         try:
-            with open(history_file, "r") as f:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _refresh(self):
+        """Reload and re-index if the file changed since we last saw it."""
+        stamp = self._file_stamp()
+        if stamp == self._stamp and (stamp is not None or not self._users):
+            return
+        users = {}
+        if stamp is not None:
+            with open(self.path, "r") as f:
+                users = json.load(f)
+        self._users = users
+        self._by_username = {u.get("username"): email for email, u in users.items() if u.get("username")}
+        self._stamp = stamp
+
+    def _save(self):
+        atomic_write_json(self.path, self._users)
+        self._stamp = self._file_stamp()
+
+    def get(self, email):
+        """User dict for `email`, or None."""
+        with self._lock:
+            self._refresh()
+            return self._users.get(email)
+
+    def find(self, identifier):
+        """
+        Look up by email first, then by username.
+        Returns (email, user_dict) or (None, None).
+        """
+        with self._lock:
+            self._refresh()
+            if identifier in self._users:
+                return identifier, self._users[identifier]
+            email = self._by_username.get(identifier)
+            if email is not None:
+                return email, self._users[email]
+            return None, None
+
+    def email_exists(self, email):
+        with self._lock:
+            self._refresh()
+            return email in self._users
+
+    def username_exists(self, username):
+        with self._lock:
+            self._refresh()
+            return username in self._by_username
+
+    def add(self, email, user):
+        """Insert or replace a user and persist the file."""
+        with self._lock:
+            self._refresh()
+            old = self._users.get(email)
+            if old and old.get("username") in self._by_username:
+                del self._by_username[old["username"]]
+            self._users[email] = user
+            if user.get("username"):
+                self._by_username[user["username"]] = email
+            self._save()
+
+    def update(self, email, fields):
+        """Merge `fields` into an existing user and persist. Returns False if the user is gone."""
+        with self._lock:
+            self._refresh()
+            user = self._users.get(email)
+            if user is None:
+                return False
+            user.update(fields)
+            self._save()
+            return True
+
+    def remove(self, email):
+        """Delete a user (no-op if missing) and persist the file."""
+        with self._lock:
+            self._refresh()
+            user = self._users.pop(email, None)
+            if user is None:
+                return
+            self._by_username.pop(user.get("username"), None)
+            self._save()
+
+
+# Shared instance used by AuthManager
+user_store = UserStore()
+
+
+# -------------------- User History --------------------
+# History lives in SQLite (HISTORY_DB): one row per capture plus one row per
+# detection, indexed by user, time and defect class. Older per-user JSON
+# files ({email}.json snapshot + {email}.jsonl journal) are imported the
+# first time a user's history is touched.
+HISTORY_DB = os.path.join(HISTORY_DIR, "history.db")
+
+_HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    email TEXT NOT NULL,
+    name TEXT,
+    image_path TEXT,
+    summary_path TEXT,
+    timestamp INTEGER NOT NULL,
+    UNIQUE (email, image_path, timestamp)
+);
+CREATE INDEX IF NOT EXISTS idx_records_email_ts ON records (email, timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_records_ts ON records (timestamp);
+
+CREATE TABLE IF NOT EXISTS detections (
+    record_id INTEGER NOT NULL REFERENCES records (id) ON DELETE CASCADE,
+    det_id TEXT,
+    class TEXT,
+    confidence REAL,
+    x1 INTEGER, y1 INTEGER, x2 INTEGER, y2 INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_detections_record ON detections (record_id);
+CREATE INDEX IF NOT EXISTS idx_detections_class ON detections (class, record_id);
+
+CREATE TABLE IF NOT EXISTS migrated_users (email TEXT PRIMARY KEY);
+"""
+
+_RECORD_COLUMNS = "id, name, image_path, summary_path, timestamp"
+
+
+class HistoryStore:
+    """SQLite-backed detection history with paginated queries."""
+    def __init__(self, path=HISTORY_DB):
+        self.path = path
+        self._local = threading.local()  # sqlite connections are per thread
+        self._migrated = set()
+        self._lock = threading.Lock()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.executescript(_HISTORY_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    # ---------- legacy JSON import ----------
+    def _ensure_migrated(self, email):
+        if email in self._migrated:
+            return
+        with self._lock:
+            conn = self._conn()
+            done = conn.execute("SELECT 1 FROM migrated_users WHERE email = ?", (email,)).fetchone()
+            if not done:
+                with conn:
+                    for record in _read_legacy_history(email):
+                        self._insert(conn, email, record, _read_summary_detections(record.get("summary_path")))
+                    conn.execute("INSERT OR IGNORE INTO migrated_users (email) VALUES (?)", (email,))
+            self._migrated.add(email)
+
+    # ---------- writes ----------
+    @staticmethod
+    def _insert(conn, email, record, detections):
+        cur = conn.execute(
+            "INSERT OR IGNORE INTO records (email, name, image_path, summary_path, timestamp) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (email, record.get("name"), record.get("image_path"), record.get("summary_path"),
+             int(record.get("timestamp", 0))),
+        )
+        if cur.rowcount == 0:
+            return None  # already stored
+        record_id = cur.lastrowid
+        rows = []
+        for d in detections or []:
+            bbox = list(d.get("bbox") or [None] * 4)[:4]
+            rows.append((record_id, d.get("id"), d.get("class"), d.get("confidence"), *bbox))
+        if rows:
+            conn.executemany(
+                "INSERT INTO detections (record_id, det_id, class, confidence, x1, y1, x2, y2) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return record_id
+
+    def add(self, email, record, detections=None):
+        """Store one capture (and its detections). Returns the new record id."""
+        self._ensure_migrated(email)
+        conn = self._conn()
+        with conn:
+            return self._insert(conn, email, record, detections)
+
+    def remove(self, record_id):
+        """Delete a record and its detections."""
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM records WHERE id = ?", (record_id,))
+
+    # ---------- reads ----------
+    @staticmethod
+    def _where(email, since, until, defect_class):
+        clauses, params = ["email = ?"], [email]
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(int(since))
+        if until is not None:
+            clauses.append("timestamp <= ?")
+            params.append(int(until))
+        if defect_class:
+            clauses.append("EXISTS (SELECT 1 FROM detections d WHERE d.record_id = records.id AND d.class = ?)")
+            params.append(defect_class)
+        return " AND ".join(clauses), params
+
+    def query(self, email, limit=50, offset=0, since=None, until=None, defect_class=None):
+        """
+        One page of a user's records, newest first. `since`/`until` are unix
+        timestamps (inclusive); `defect_class` keeps records with at least
+        one detection of that class (e.g. "Short Circuits").
+        """
+        self._ensure_migrated(email)
+        where, params = self._where(email, since, until, defect_class)
+        sql = f"SELECT {_RECORD_COLUMNS} FROM records WHERE {where} ORDER BY timestamp DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [int(limit), int(offset)]
+        return [dict(row) for row in self._conn().execute(sql, params)]
+
+    def count(self, email, since=None, until=None, defect_class=None):
+        """Number of records matching the same filters as query()."""
+        self._ensure_migrated(email)
+        where, params = self._where(email, since, until, defect_class)
+        return self._conn().execute(f"SELECT COUNT(*) FROM records WHERE {where}", params).fetchone()[0]
+
+    def defect_classes(self, email):
+        """Distinct defect classes found in a user's history, for filter menus."""
+        self._ensure_migrated(email)
+        rows = self._conn().execute(
+            "SELECT DISTINCT d.class FROM detections d JOIN records r ON r.id = d.record_id "
+            "WHERE r.email = ? AND d.class IS NOT NULL ORDER BY d.class", (email,))
+        return [row[0] for row in rows]
+
+
+def _read_legacy_history(email):
+    """Records from the old per-user JSON snapshot + journal, without duplicates."""
+    base = os.path.join(HISTORY_DIR, email)
+    history = []
+    if os.path.exists(f"{base}.json"):
+        try:
+            with open(f"{base}.json", "r") as f:
                 history = json.load(f)
         except Exception:
             history = []
 
-        for record in history:
-            image_exists = record.get("image_path") and os.path.exists(record["image_path"])
-            summary_exists = record.get("summary_path") and os.path.exists(record["summary_path"])
-            if image_exists and summary_exists:
-                valid_history.append(record)
+    seen = {(r.get("image_path"), r.get("timestamp")) for r in history}
+    for record in read_json_lines(f"{base}.jsonl"):
+        key = (record.get("image_path"), record.get("timestamp"))
+        if key not in seen:
+            seen.add(key)
+            history.append(record)
+    return history
+
+
+def _read_summary_detections(summary_path):
+    """Detections list from a summary file, or [] if it can't be read."""
+    if not summary_path or not os.path.exists(summary_path):
+        return []
+    try:
+        return read_detections(summary_path)
+    except Exception:
+        return []
+
+
+# Shared instance used by the pages
+history_store = HistoryStore()
 
-        # Save filtered history back to file
-        with open(history_file, "w") as f:
-            json.dump(valid_history, f, indent=4)
 
-    return valid_history
+# -------------------- History change notifications --------------------
+# Observers are called as callback(event, email, record) with event
+# "added" or "removed", on whichever thread changed the history (often the
+# background writer) -- Tk observers must hop to their own thread.
+_history_observers = []
 
 
-def save_user_history(email, record):
+def subscribe_history(callback):
+    """Register `callback` for history changes."""
+    if callback not in _history_observers:
+        _history_observers.append(callback)
+
+
+def unsubscribe_history(callback):
+    if callback in _history_observers:
+        _history_observers.remove(callback)
+
+
+def _notify_history(event, email, record):
+    for callback in list(_history_observers):
+        try:
+            callback(event, email, record)
+        except Exception:
+            pass  # a broken observer must not break saving
+
+
+def load_user_history(email):
+    """
+    Load a list of the user's past detections, newest first.
+    Each entry: {"id": ..., "name": ..., "image_path": ..., "summary_path": ..., "timestamp": ...}
+    Files are not checked here; callers verify them when a record is opened.
+    """
+    return history_store.query(email, limit=None)
+
+
+def save_user_history(email, record, detections=None):
     """
     Append a new detection record to the user's history.
     `record` should be a dict: {"name": ..., "image_path": ..., "summary_path": ..., "timestamp": ...}
+    `detections` is the summary's detections list (indexed for class filters).
     """
-    os.makedirs(HISTORY_DIR, exist_ok=True)
-    history_file = os.path.join(HISTORY_DIR, f"{email}.json")
-    history = []
+    record_id = history_store.add(email, record, detections)
+    if record_id is not None:
+        _notify_history("added", email, {"id": record_id, **record})
+    return record_id
 
-    if os.path.exists(history_file):
-        try:
-            with open(history_file, "r") as f:
-                history = json.load(f)
-        except Exception:
-            history = []
 
-    history.append(record)
-    with open(history_file, "w") as f:
-        json.dump(history, f, indent=4)
+def delete_user_history(email, record_id):
+    """Remove one history record (e.g. when its files are gone)."""
+    history_store.remove(record_id)
+    _notify_history("removed", email, {"id": record_id})
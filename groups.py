@@ -0,0 +1,105 @@
+"""
+Inspection groups: one YOLO model per group, each with its own labels and colors.
+
+Kept free of cv2/numpy so pages, analytics and the results legend can
+import it without pulling in the inference stack.
+"""
+import os
+
+MODEL_PATH = "defect_8.pt"
+
+# Mapping from YOLO class → (short label, full description)
+CLASS_MAP = {
+    "open": ("A", "Broken Traces"),
+    "short": ("B", "Short Circuits"),
+    "90-degree": ("C", "90 Degree Angle"),
+}
+
+# Colors for each class (BGR format for OpenCV)
+COLOR_MAP = {
+    "A": (0, 0, 255),     # Red for Broken Traces
+    "B": (0, 255, 0),     # Green for Short Circuits
+    "C": (255, 0, 0),     # Blue for 90 Degree Angle
+}
+
+DEFECT_B_MODEL_PATH = os.environ.get("VISIONBOARD_DEFECT_B_MODEL", "defect_b.pt")
+
+DEFECT_B_CLASS_MAP = {
+    "mouse_bite": ("D", "Mouse Bite"),
+    "spur": ("E", "Spur"),
+    "spurious_copper": ("F", "Spurious Copper"),
+    "missing_hole": ("G", "Missing Hole"),
+}
+
+DEFECT_B_COLOR_MAP = {
+    "D": (0, 165, 255),   # Orange
+    "E": (255, 0, 255),   # Magenta
+    "F": (255, 255, 0),   # Cyan
+    "G": (128, 0, 128),   # Purple
+}
+
+COMPONENTS_MODEL_PATH = os.environ.get("VISIONBOARD_COMPONENTS_MODEL", "components.pt")
+
+# Short labels follow reference designator prefixes (R12, C3, U1, ...)
+COMPONENTS_CLASS_MAP = {
+    "resistor": ("R", "Resistor"),
+    "capacitor": ("C", "Capacitor"),
+    "ic": ("U", "Integrated Circuit"),
+    "diode": ("D", "Diode"),
+    "led": ("LED", "LED"),
+    "transistor": ("Q", "Transistor"),
+    "inductor": ("L", "Inductor"),
+    "connector": ("J", "Connector"),
+}
+
+COMPONENTS_COLOR_MAP = {
+    "R": (0, 0, 255),
+    "C": (0, 255, 0),
+    "U": (255, 0, 0),
+    "D": (0, 165, 255),
+    "LED": (0, 255, 255),
+    "Q": (255, 0, 255),
+    "L": (255, 255, 0),
+    "J": (128, 128, 128),
+}
+
+
+class InspectionGroup:
+    """Weights, labels and output folders for one kind of inspection."""
+    def __init__(self, key, title, page, model_path, class_map, color_map, subdir, processed_dir):
+        self.key = key
+        self.title = title
+        self.page = page                    # page that captures for this group
+        self.model_path = model_path
+        self.class_map = class_map
+        self.color_map = color_map
+        self.subdir = subdir                # captured_images/<subdir>, processed_results/<subdir>
+        self.processed_dir = processed_dir  # where processed_<name> images go
+
+    def legend(self):
+        """[(short label, description, BGR color)] in label order."""
+        return [(short, full, self.color_map.get(short))
+                for short, full in sorted(self.class_map.values())]
+
+
+DEFECT_A = "defect_a"
+DEFECT_B = "defect_b"
+COMPONENTS = "components"
+DEFAULT_GROUP = DEFECT_A
+
+# Group A keeps its original layout (processed images directly in processed_results/)
+GROUPS = {
+    DEFECT_A: InspectionGroup(DEFECT_A, "Defect Group A", "DefectA", MODEL_PATH,
+                              CLASS_MAP, COLOR_MAP, "defectA", "processed_results"),
+    DEFECT_B: InspectionGroup(DEFECT_B, "Defect Group B", "DefectB", DEFECT_B_MODEL_PATH,
+                              DEFECT_B_CLASS_MAP, DEFECT_B_COLOR_MAP, "defectB",
+                              os.path.join("processed_results", "defectB")),
+    COMPONENTS: InspectionGroup(COMPONENTS, "Components Detection", "Components", COMPONENTS_MODEL_PATH,
+                                COMPONENTS_CLASS_MAP, COMPONENTS_COLOR_MAP, "components",
+                                os.path.join("processed_results", "components")),
+}
+
+
+def get_group(key=None) -> InspectionGroup:
+    """Group for `key` (default group if None). Raises KeyError for unknown keys."""
+    return GROUPS[key or DEFAULT_GROUP]
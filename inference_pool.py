@@ -0,0 +1,127 @@
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+
+# Number of inference processes the GUI uses; 0 keeps inference in-process.
+INFERENCE_PROCESSES = int(os.environ.get("VISIONBOARD_PROCESSES", "0"))
+
+
+# ---------------- Worker process side ----------------
+_worker_model_path = None
+
+
+def _init_worker(model_path: str, torch_threads: int) -> None:
+    """Load this process's own model instance once, when the worker starts."""
+    global _worker_model_path
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)  # N processes x 1 thread beats N x all-cores
+    except Exception:
+        pass
+
+    import predict
+    predict.registry.get(model_path)
+    _worker_model_path = model_path
+
+
+def _worker_detect(shm_name: str, shape, dtype: str):
+    """Copy the parent's shared-memory frame, run YOLO, return box arrays."""
+    import predict
+
+    # Copy out before inference: ultralytics keeps the input (orig_img) on the
+    # result, and a live view into the segment would make close() fail
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        frame = np.array(view)
+        del view
+    finally:
+        shm.close()
+
+    model = predict.registry.get(_worker_model_path)
+    results = model.predict(frame, conf=predict.PREDICT_CONF, imgsz=predict.PREDICT_IMGSZ, verbose=False)
+    if not results:
+        raise ValueError("No results returned by YOLO.")
+    labels, confs, xyxy = predict.boxes_to_arrays(results[0])
+    return labels.tolist(), confs, xyxy
+
+
+# ---------------- Parent side ----------------
+class InferencePool:
+    """
+    N worker processes, each holding its own YOLO model. Frames are handed
+    over through shared memory; only the (small) box arrays come back, and
+    annotation/saving stay in the caller.
+
+    detect() has the same signature as predict.detect_boxes(), so it can be
+    passed as `detector=` to analyze_image()/analyze_frame().
+    """
+    def __init__(self, processes: Optional[int] = None, model_path: Optional[str] = None,
+                 torch_threads: int = 1):
+        from predict import MODEL_PATH
+
+        self.processes = processes or os.cpu_count() or 1
+        self.model_path = model_path or MODEL_PATH
+        # spawn: never fork a process that has Tk or camera threads running
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.model_path, torch_threads),
+        )
+
+    def submit(self, frame: np.ndarray):
+        """Queue a BGR frame. Returns a Future of (labels, confs, xyxy)."""
+        frame = np.ascontiguousarray(frame)
+        shm = shared_memory.SharedMemory(create=True, size=max(frame.nbytes, 1))
+        try:
+            np.ndarray(frame.shape, dtype=frame.dtype, buffer=shm.buf)[...] = frame
+            future = self._executor.submit(_worker_detect, shm.name, frame.shape, frame.dtype.str)
+        except Exception:
+            shm.close()
+            shm.unlink()
+            raise
+
+        def _cleanup(_):
+            shm.close()
+            shm.unlink()
+
+        future.add_done_callback(_cleanup)
+        return future
+
+    def detect(self, frame: np.ndarray):
+        """Blocking detect: (labels, confs, xyxy) arrays for one frame."""
+        labels, confs, xyxy = self.submit(frame).result()
+        return np.array(labels, dtype=object), confs, xyxy
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pools = {}  # model path -> InferencePool
+_pool_lock = threading.Lock()
+
+
+def get_pool(group=None) -> Optional[InferencePool]:
+    """
+    Shared pool for `group`'s model (default group if None), sized by
+    INFERENCE_PROCESSES, or None when process mode is off. Pools start on
+    first use, so a group that is never inspected costs no processes.
+    """
+    if INFERENCE_PROCESSES <= 0:
+        return None
+    from groups import get_group
+
+    model_path = get_group(group).model_path
+    with _pool_lock:
+        pool = _pools.get(model_path)
+        if pool is None:
+            pool = _pools[model_path] = InferencePool(INFERENCE_PROCESSES, model_path=model_path)
+            atexit.register(pool.close)
+        return pool
@@ -1,5 +1,26 @@
-from app import VisionBoard
+import argparse
+import sys
+
+from startup_profile import DEFAULT_BUDGET_FILE, DEFAULT_REPORT_FILE
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="VisionBoard PCB inspection")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="time imports, model load and page construction, then exit")
+    parser.add_argument("--report", default=DEFAULT_REPORT_FILE,
+                        help=f"startup profile report path (default: {DEFAULT_REPORT_FILE})")
+    parser.add_argument("--budget", default=DEFAULT_BUDGET_FILE,
+                        help=f"JSON of per-entry limits in seconds; exit 1 if exceeded (default: {DEFAULT_BUDGET_FILE})")
+    return parser.parse_args(argv)
+
 
 if __name__ == "__main__":
+    args = parse_args()
+    if args.profile_startup:
+        from startup_profile import run
+        sys.exit(run(report_path=args.report, budget_path=args.budget))
+
+    from app import VisionBoard
     app = VisionBoard()
     app.mainloop()
@@ -0,0 +1,163 @@
+"""
+Per-stage timing metrics.
+
+Each stage (capture, decode, inference, annotation, encode, save, ...) keeps
+a rolling window of its most recent durations; percentiles are computed
+over that window on demand. Snapshots can be exported as a Prometheus
+text file (for node_exporter's textfile collector) or appended to a JSONL
+log, so a regression after a model or hardware swap shows up per stage.
+
+Set VISIONBOARD_METRICS_DIR to have the app export both every 15 s.
+"""
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+METRICS_DIR = os.environ.get("VISIONBOARD_METRICS_DIR", "")
+PROMETHEUS_FILE = "visionboard.prom"
+JSONL_FILE = "metrics.jsonl"
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Display order for known stages; anything else is listed after these
+STAGES = ("capture", "decode", "preprocess", "inference", "annotation", "encode", "save", "end_to_end")
+
+
+def _percentile(ordered, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class StageMetrics:
+    """Rolling per-stage duration windows (milliseconds) plus lifetime totals."""
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._samples = {}
+        self._totals = {}  # stage -> [count, sum_ms] over the whole run
+        self._lock = threading.Lock()
+        self._exporter = None
+
+    def record(self, stage: str, ms: float) -> None:
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.window)
+                self._totals[stage] = [0, 0.0]
+            samples.append(ms)
+            totals = self._totals[stage]
+            totals[0] += 1
+            totals[1] += ms
+
+    def record_timings(self, timings: dict) -> None:
+        """Record every stage of a `timings_ms` dict as produced by predict."""
+        for stage, ms in (timings or {}).items():
+            self.record(stage, ms)
+
+    @contextmanager
+    def timer(self, stage: str):
+        """`with metrics.timer("save"): ...` records the block's duration."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, (time.perf_counter() - started) * 1000)
+
+    def stages(self):
+        with self._lock:
+            names = list(self._samples)
+        return [s for s in STAGES if s in names] + sorted(s for s in names if s not in STAGES)
+
+    def snapshot(self) -> dict:
+        """{stage: {"count", "total_ms", "mean", "p50", "p95", "p99", "last"}} (window stats in ms)."""
+        with self._lock:
+            copies = {stage: list(samples) for stage, samples in self._samples.items()}
+            totals = {stage: tuple(t) for stage, t in self._totals.items()}
+
+        snap = {}
+        for stage in self.stages():
+            samples = copies[stage]
+            ordered = sorted(samples)
+            stats = {
+                "count": totals[stage][0],
+                "total_ms": round(totals[stage][1], 3),
+                "mean": round(sum(samples) / len(samples), 3) if samples else 0.0,
+                "last": round(samples[-1], 3) if samples else 0.0,
+            }
+            for q in QUANTILES:
+                stats[f"p{int(q * 100)}"] = round(_percentile(ordered, q), 3)
+            snap[stage] = stats
+        return snap
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._totals.clear()
+
+    # ---------------- Export ----------------
+    def prometheus_text(self) -> str:
+        """Snapshot in the Prometheus text exposition format (seconds, per convention)."""
+        lines = [
+            "# HELP visionboard_stage_seconds Duration of each pipeline stage (rolling window).",
+            "# TYPE visionboard_stage_seconds summary",
+        ]
+        for stage, stats in self.snapshot().items():
+            for q in QUANTILES:
+                value = stats[f"p{int(q * 100)}"] / 1000
+                lines.append(f'visionboard_stage_seconds{{stage="{stage}",quantile="{q}"}} {value:.6f}')
+            lines.append(f'visionboard_stage_seconds_sum{{stage="{stage}"}} {stats["total_ms"] / 1000:.6f}')
+            lines.append(f'visionboard_stage_seconds_count{{stage="{stage}"}} {stats["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def export_prometheus(self, path: str) -> str:
+        """Atomically replace `path` so a scraper never reads half a file."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(self.prometheus_text())
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return path
+
+    def export_jsonl(self, path: str) -> str:
+        """Append one {"time", "stages"} line."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "a") as f:
+            f.write(json.dumps({"time": round(time.time(), 3), "stages": self.snapshot()}) + "\n")
+        return path
+
+    def export(self, directory: str):
+        """Write both formats into `directory`. Returns (prometheus_path, jsonl_path)."""
+        return (self.export_prometheus(os.path.join(directory, PROMETHEUS_FILE)),
+                self.export_jsonl(os.path.join(directory, JSONL_FILE)))
+
+    def start_exporter(self, directory: str, interval: float = 15.0) -> None:
+        """Export into `directory` every `interval` seconds on a daemon thread (once per process)."""
+        if self._exporter is not None:
+            return
+
+        def _loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.export(directory)
+                except OSError:
+                    pass  # disk full / unmounted; try again next round
+
+        self._exporter = threading.Thread(target=_loop, name="metrics-exporter", daemon=True)
+        self._exporter.start()
+
+
+# Shared instance: predict, the camera service and the pages all record here
+metrics = StageMetrics()
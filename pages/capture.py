@@ -0,0 +1,142 @@
+import os
+import time
+from tkinter import messagebox
+import cv2
+import numpy as np
+from db import save_user_history
+from groups import DEFAULT_GROUP, get_group
+from inference_pool import get_pool
+from metrics import metrics
+from predict import (analyze_image, model_error, model_state, registry, submit_write, warm_up_model,
+                     write_image_async)
+from summaries import from_analysis, summary_extension, write_summary
+
+CAPTURE_SIZE = (640, 480)
+
+
+class CaptureAnalysis:
+    """
+    Capture -> analyze (scheduled) -> save pipeline shared by the camera
+    pages. Each page sets GROUP (see groups.py) and provides
+    self.controller, self.current_frame and self.status_label.
+    """
+    GROUP = DEFAULT_GROUP
+
+    @property
+    def capture_job(self) -> str:
+        """Scheduler key: a newer capture from the same page replaces a queued one."""
+        return f"{type(self).__name__}.capture"
+
+    # ---------------- Model status ----------------
+    def _update_model_status(self) -> None:
+        """Show this group's model load state; keep polling until it settles."""
+        self._status_job = None
+        warm_up_model(self.GROUP)  # no-op once loading/loaded; other groups load on first visit
+        state = model_state(self.GROUP)
+        if state == registry.READY:
+            self.status_label.config(text="Model ready")
+            return
+        if state == registry.FAILED:
+            self.status_label.config(text=f"Model failed to load: {model_error(self.GROUP)}")
+            return
+
+        self.status_label.config(text="Loading model...")
+        self._status_job = self.after(500, self._update_model_status)
+
+    # ---------------- Capture ----------------
+    def capture_image(self) -> None:
+        """Queue analysis of the current frame on the shared inference scheduler."""
+        frame = self.current_frame
+        if frame is None:
+            messagebox.showerror("Error", "No frame captured.")
+            return
+
+        # Get current user email
+        user = getattr(self.controller.auth, "current_user", None)
+        email = user.get("email") if user else "guest@example.com"
+
+        # The frame is snapshotted now (camera frames are never modified), and a
+        # newer click replaces a capture that is still waiting in the queue
+        self.controller.scheduler.submit(
+            self._analyze_capture, frame, email, time.perf_counter(),
+            on_done=self._show_capture_result,
+            on_error=self._show_capture_error,
+            key=self.capture_job,
+        )
+        self.status_label.config(text="Analyzing capture...")
+
+    def _analyze_capture(self, frame: np.ndarray, email: str, requested: float):
+        """Scheduler job: run the group's model on the frame and queue saving image, summary and history."""
+        group = get_group(self.GROUP)
+        save_dir = os.path.join("captured_images", group.subdir)
+        os.makedirs(save_dir, exist_ok=True)
+
+        timestamp = int(time.time())
+        filename = f"{email}_{timestamp}.jpg"
+        filepath = os.path.join(save_dir, filename)
+
+        with metrics.timer("preprocess"):
+            small_img = cv2.resize(frame, CAPTURE_SIZE)
+            raw_img = small_img.copy()  # analyze_image draws on small_img in place
+
+        # Keep the raw capture even if analysis fails (e.g. the group's weights are missing)
+        write_image_async(filepath, raw_img).add_done_callback(self._on_persist_done)
+
+        # Worker processes when enabled (VISIONBOARD_PROCESSES), otherwise in-process
+        pool = get_pool(group.key)
+        processed_path, summary = analyze_image(small_img, name=filename, group=group.key,
+                                                detector=pool.detect if pool else None,
+                                                on_saved=self._on_persist_done)
+        detections = summary.get("detections", [])
+
+        summary_dir = os.path.join("processed_results", group.subdir)
+        os.makedirs(summary_dir, exist_ok=True)
+        # Versioned summary; large detection sets go to the columnar .npz encoding
+        summary_path = os.path.join(summary_dir, f"summary_{filename}{summary_extension(detections)}")
+        summary_data = from_analysis(summary, image_file=filepath, email=email, captured=timestamp)
+
+        # Save detection to user history
+        record = {
+            "name": f"{group.page} Capture {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp))}",
+            "image_path": processed_path,
+            "summary_path": summary_path,
+            "timestamp": timestamp
+        }
+
+        # Persist off the critical path; the writer runs jobs in order, so the
+        # history record is only added once both images have been written
+        submit_write(self._save_summary_and_history, email, summary_path, summary_data, record) \
+            .add_done_callback(self._on_persist_done)
+
+        return small_img, detections, processed_path, summary_path, requested
+
+    def _show_capture_result(self, result) -> None:
+        """Tk thread: show the analyzed capture straight from memory."""
+        annotated, detections, processed_path, summary_path, requested = result
+        self.status_label.config(text="")
+        # Click to result on screen, including time spent queued behind other jobs
+        metrics.record("end_to_end", (time.perf_counter() - requested) * 1000)
+
+        result_page = self.controller.get_frame("DefectResult")
+        result_page.set_result(annotated, detections, processed_path, summary_path, group=self.GROUP)
+        self.controller.show_frame("DefectResult")
+
+    def _show_capture_error(self, error: Exception) -> None:
+        self.status_label.config(text="")
+        messagebox.showerror("Prediction Error", f"Failed to analyze image:\n{error}")
+
+    @staticmethod
+    def _save_summary_and_history(email: str, summary_path: str, summary: dict, record: dict) -> None:
+        """Write the summary file and history record (runs on the background writer)."""
+        # Queued after the processed image write, which has finished by now;
+        # if that failed it was already reported through on_saved
+        if not os.path.exists(record["image_path"]):
+            return
+        write_summary(summary_path, summary)
+        save_user_history(email, record, summary["detections"])
+
+    def _on_persist_done(self, future) -> None:
+        """Report background save failures on the Tk thread."""
+        error = future.exception()
+        if error is not None:
+            self.after(0, lambda: messagebox.showerror("Save Error", f"Failed to save capture:\n{error}"))
@@ -1,30 +1,41 @@
 import tkinter as tk
 from tkinter import messagebox
-from PIL import Image, ImageTk
 import cv2
-import os
 import time
-import json
 import threading
 import numpy as np
 from typing import Optional
-from predict import analyze_image  # your YOLO analyze_image function
-from db import save_user_history  # Make sure this is imported
-
-class DefectA(tk.Frame):
+from camera import CameraService, acquire_camera, release_camera
+from groups import DEFECT_A
+from preview import PreviewRenderer
+from metrics import metrics
+from pages.capture import CaptureAnalysis
+from predict import detect_boxes, draw_boxes
+
+class DefectA(CaptureAnalysis, tk.Frame):
     """
     Restyled DefectA to match the visual design of DefectB
     (colors, navbar, header, layout). Keeps original DefectA
-    functionality: open camera, capture -> analyze (threaded),
+    functionality: open camera, capture -> analyze (scheduled),
     save image and JSON summary, and navigate to results page.
     """
+    GROUP = DEFECT_A
+
     def __init__(self, parent: tk.Widget, controller):
         super().__init__(parent, bg="#02517F")
         self.controller = controller
 
-        self.cap: Optional[cv2.VideoCapture] = None
+        self.camera: Optional[CameraService] = None
+        self._preview_job: Optional[str] = None
         self.current_frame: Optional[np.ndarray] = None
-        self.imgtk: Optional[ImageTk.PhotoImage] = None
+        self._status_job: Optional[str] = None
+
+        # Live detection state (written by the worker, read by the Tk thread)
+        self._live_running = False
+        self._live_stop: Optional[threading.Event] = None
+        self._live_result = None  # (labels, confs, xyxy) of the newest prediction
+        self._live_fps = 0.0
+        self._live_error = None
 
         # Grid config: camera row expands
         self.grid_rowconfigure(1, weight=1)
@@ -69,6 +80,12 @@ class DefectA(tk.Frame):
         # ---------------- Camera display ----------------
         self.video_label = tk.Label(self, bg="#02517F")
         self.video_label.grid(row=1, column=0, sticky="nsew", pady=10, padx=20)
+        self.preview = PreviewRenderer(self.video_label, size=(640, 480))
+
+        # ---------------- Status line ----------------
+        self.status_label = tk.Label(self, text="", font=("Arial", 11),
+                                     bg="#02517F", fg="#A9D6F5")
+        self.status_label.grid(row=3, column=0, pady=(0, 10))
 
         # ---------------- Buttons ----------------
         button_frame = tk.Frame(self, bg="#02517F")
@@ -99,110 +116,162 @@ class DefectA(tk.Frame):
         )
         self.capture_btn.pack(side="left", padx=10)
 
+        self.live_btn = tk.Button(
+            button_frame,
+            text="Live Detect: Off",
+            command=self.toggle_live_detect,
+            font=("Arial", 12),
+            bg="#013B5C",
+            fg="white",
+            width=16,
+            height=2,
+            state="disabled"
+        )
+        self.live_btn.pack(side="left", padx=10)
+
+        self.diag_btn = tk.Button(
+            button_frame,
+            text="Diagnostics",
+            command=controller.show_diagnostics,
+            font=("Arial", 12),
+            bg="#013B5C",
+            fg="white",
+            width=12,
+            height=2
+        )
+        self.diag_btn.pack(side="left", padx=10)
+
+    def on_show(self) -> None:
+        """Called when the page is raised."""
+        if self._status_job is None:
+            self._update_model_status()
+
     # ---------------- Camera methods ----------------
     def start_camera(self) -> None:
         """Open the webcam and start preview. Enable capture button."""
-        if self.cap is None:
-            self.cap = cv2.VideoCapture(0, cv2.CAP_V4L2)  # Linux (Raspberry Pi)
+        if self.camera is None:
+            # V4L2 backend for Linux (Raspberry Pi); shared with the other camera pages
+            self.camera = acquire_camera(0, backend=cv2.CAP_V4L2, width=640, height=480, fps=30)
 
-            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-            self.cap.set(cv2.CAP_PROP_FPS, 30)
-
-            if not self.cap.isOpened():
-                self.cap.release()
-                self.cap = None
+            if self.camera is None:
                 messagebox.showerror("Camera Error", "No camera detected. Please connect a camera.")
                 return
 
             self.capture_btn.config(state="normal")
+            self.live_btn.config(state="normal")
             self.open_btn.config(text="Close Camera", command=self.stop_camera)
             self.update_frame()
 
     def update_frame(self) -> None:
-        """Continuously read frames and update the label."""
-        if self.cap and self.cap.isOpened():
-            ret, frame = self.cap.read()
-            if ret:
-                self.current_frame = frame.copy()
-
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                img = Image.fromarray(frame_rgb)
-                img = img.resize((640, 480), Image.Resampling.LANCZOS)
-
-                self.imgtk = ImageTk.PhotoImage(image=img)
-                self.video_label.config(image=self.imgtk)
-
-            self.after(33, self.update_frame)  # ~30 FPS
-
-    def capture_image(self) -> None:
-        """Trigger threaded analysis of the current frame (keeps UI responsive)."""
-        if self.current_frame is not None:
-            threading.Thread(target=self._analyze_image_thread, daemon=True).start()
+        """Show the newest frame from the camera service (never blocks on the device)."""
+        self._preview_job = None
+        if self.camera and self.camera.is_opened():
+            frame_id, frame = self.camera.latest()
+            if frame is not None:
+                # Shared with other readers: keep it as-is, draw on a copy
+                self.current_frame = frame
+
+                # Only redraw when the frame or the live overlay changed
+                result = self._live_result if self._live_running else None
+                key = (frame_id, id(result))
+                if self.preview.needs_render(key):
+                    # Overlay the latest live result; the model itself runs on the worker
+                    if result is not None:
+                        frame = frame.copy()
+                        draw_boxes(frame, *result, group=self.GROUP)
+                    self.preview.render(frame, key)
+
+                if self._live_running and self._live_fps:
+                    self.status_label.config(text=f"Live detect: {self._live_fps:.1f} FPS")
+                elif self._live_running and self._live_error:
+                    self.status_label.config(text=f"Live detect paused: {self._live_error}")
+
+            self._preview_job = self.after(33, self.update_frame)  # ~30 FPS
+
+    # ---------------- Live detection ----------------
+    def toggle_live_detect(self) -> None:
+        """Switch continuous detection on the preview on/off."""
+        if self._live_running:
+            self.stop_live_detect()
         else:
-            messagebox.showerror("Error", "No frame captured.")
+            self.start_live_detect()
 
-    def _analyze_image_thread(self) -> None:
-        """Save a copy, run YOLO analyze_image, save summary JSON, and show results."""
-        frame = self.current_frame
-        if frame is None:
+    def start_live_detect(self) -> None:
+        if self._live_running or self.camera is None:
             return
-
-        try:
-            save_dir = "captured_images/defectA"
-            os.makedirs(save_dir, exist_ok=True)
-
-            # Get current user email
-            user = getattr(self.controller.auth, "current_user", None)
-            email = user.get("email") if user else "guest@example.com"
-
-            timestamp = int(time.time())
-            filename = f"{email}_{timestamp}.jpg"
-            filepath = os.path.join(save_dir, filename)
-
-            small_img = cv2.resize(frame, (640, 480))
-            cv2.imwrite(filepath, small_img)
-
-            processed_path, summary = analyze_image(filepath)
-
-            summary_dir = "processed_results/defectA"
-            os.makedirs(summary_dir, exist_ok=True)
-            summary_path = os.path.join(summary_dir, f"summary_{filename}.json")
-            with open(summary_path, "w") as f:
-                json.dump(summary.get("detections", summary), f)
-
-            # Save detection to user history
-            record = {
-                "name": f"DefectA Capture {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp))}",
-                "image_path": processed_path,
-                "summary_path": summary_path,
-                "timestamp": timestamp
-            }
-            save_user_history(email, record)
-
-            # Show result page
-            result_page = self.controller.frames.get("DefectResult")
-            if result_page:
-                result_page.set_paths(processed_path, summary_path)
-
-            self.controller.show_frame("DefectResult")
-
-        except Exception as e:
-            messagebox.showerror("Prediction Error", f"Failed to analyze image:\n{e}")
+        self._live_running = True
+        self._live_result = None
+        self._live_fps = 0.0
+        self._live_error = None
+        # Each run gets its own stop event so a worker still finishing a
+        # prediction from a previous run can never outlive its toggle
+        self._live_stop = threading.Event()
+        threading.Thread(target=self._live_loop, args=(self._live_stop,),
+                         name="live-detect", daemon=True).start()
+        self.live_btn.config(text="Live Detect: On", bg="#029DF7")
+
+    def stop_live_detect(self) -> None:
+        self._live_running = False
+        if self._live_stop is not None:
+            self._live_stop.set()
+            self._live_stop = None
+        self._live_result = None
+        self._live_fps = 0.0
+        self._live_error = None
+        self.live_btn.config(text="Live Detect: Off", bg="#013B5C")
+
+    def _live_loop(self, stop: threading.Event) -> None:
+        """
+        Worker: always run the model on the newest frame. Frames that arrive
+        while a prediction is in flight are skipped, so the overlay never
+        falls behind the camera.
+        """
+        last_frame = None
+        while not stop.is_set():
+            frame = self.current_frame
+            if frame is None or frame is last_frame:
+                time.sleep(0.005)
+                continue
+            last_frame = frame
+
+            started = time.perf_counter()
+            try:
+                # Plain arrays, so the Tk thread can redraw them on every frame for free
+                result = detect_boxes(frame, self.GROUP)
+            except Exception as e:
+                # Model not available (yet) or failing: drop the stale overlay and rate
+                self._live_result = None
+                self._live_fps = 0.0
+                self._live_error = str(e)
+                time.sleep(0.5)
+                continue
+            elapsed = time.perf_counter() - started
+            metrics.record("inference", elapsed * 1000)
+
+            if stop.is_set():
+                break
+            self._live_result = result
+            self._live_error = None
+
+            # Smoothed achieved inference rate
+            fps = 1.0 / elapsed if elapsed > 0 else 0.0
+            self._live_fps = fps if not self._live_fps else 0.8 * self._live_fps + 0.2 * fps
 
     def stop_camera(self) -> None:
         """Stop camera preview and reset buttons/UI pieces."""
-        if self.cap:
-            try:
-                self.cap.release()
-            except Exception:
-                pass
-            self.cap = None
-
-        self.video_label.config(image="")
-        self.imgtk = None
+        self.stop_live_detect()
+        self.controller.scheduler.cancel(self.capture_job)  # results for a closed camera are stale
+        if self._preview_job is not None:
+            self.after_cancel(self._preview_job)
+            self._preview_job = None
+        release_camera(self.camera)
+        self.camera = None
+        self.current_frame = None
+
+        self.preview.clear()
         self.open_btn.config(text="Open Camera", command=self.start_camera)
         self.capture_btn.config(state="disabled")
+        self.live_btn.config(state="disabled")
 
     def on_hide(self) -> None:
         """Call this when the frame is hidden to ensure the camera is released."""
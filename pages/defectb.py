@@ -1,17 +1,20 @@
 import tkinter as tk
 from tkinter import messagebox
-from PIL import Image, ImageTk
-import cv2
-import os
-import time
+from camera import acquire_camera, release_camera
+from groups import DEFECT_B
+from pages.capture import CaptureAnalysis
+from preview import PreviewRenderer
 
 
-class DefectB(tk.Frame):
+class DefectB(CaptureAnalysis, tk.Frame):
+    GROUP = DEFECT_B
+
     def __init__(self, parent, controller):
         super().__init__(parent, bg="#02517F")
         self.controller = controller
-        self.cap = None
-        self.imgtk = None
+        self.camera = None  # shared CameraService
+        self._preview_job = None
+        self._status_job = None
         self.current_frame = None  # store last frame for capture
 
         # === Screen dimensions for resizing ===
@@ -67,6 +70,7 @@ class DefectB(tk.Frame):
         # === Camera display (row 1) ===
         self.video_label = tk.Label(self, bg="#02517F")
         self.video_label.grid(row=1, column=0, sticky="nsew", pady=10)
+        self.preview = PreviewRenderer(self.video_label, max_size=(self.cam_w, self.cam_h))
 
         # === Buttons (row 2) ===
         button_frame = tk.Frame(self, bg="#02517F")
@@ -96,6 +100,11 @@ class DefectB(tk.Frame):
         )
         self.stop_btn.pack(side="left", padx=10)
 
+        # === Status line (row 3): model load state, capture progress ===
+        self.status_label = tk.Label(self, text="", font=("Arial", 11),
+                                     bg="#02517F", fg="#A9D6F5")
+        self.status_label.grid(row=3, column=0, pady=(0, 10))
+
     def start_camera(self):
         """Start webcam feed only if logged in."""
         if not self.controller.auth.is_logged_in:
@@ -103,72 +112,48 @@ class DefectB(tk.Frame):
             self.controller.show_frame("Home")
             return
 
-        if self.cap is None:
-            self.cap = cv2.VideoCapture(0)
+        if self.camera is None:
+            self.camera = acquire_camera(0)
 
             # ✅ Check if camera opened successfully
-            if not self.cap.isOpened():
-                self.cap.release()
-                self.cap = None
+            if self.camera is None:
                 messagebox.showerror("Camera Error", "No camera detected. Please connect a camera.")
                 return
 
         # Change "Open Camera" button to "Capture Image"
         self.open_btn.config(text="Capture Image", command=self.capture_image)
 
-        self.update_frame()
+        if self._preview_job is None:
+            self.update_frame()
 
 
     def update_frame(self):
-        """Continuously update camera frames."""
-        if self.cap and self.cap.isOpened():
-            ret, frame = self.cap.read()
-            if ret:
-                self.current_frame = frame.copy()  # keep original frame for saving
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-                # --- Maintain aspect ratio ---
-                h, w, _ = frame_rgb.shape
-                aspect_ratio = w / h
-
-                # fit height first
-                new_h = self.cam_h
-                new_w = int(new_h * aspect_ratio)
-
-                if new_w > self.cam_w:  # too wide, fit width instead
-                    new_w = self.cam_w
-                    new_h = int(new_w / aspect_ratio)
-
-                frame_resized = cv2.resize(frame_rgb, (new_w, new_h))
-
-                img = Image.fromarray(frame_resized)
-                self.imgtk = ImageTk.PhotoImage(image=img)
-                self.video_label.config(image=self.imgtk)
-
-            self.after(33, self.update_frame)  # ~30 fps
-
-    def capture_image(self):
-        """Capture current frame and save with username in lowercase."""
-        if self.current_frame is not None:
-            save_dir = "captured_images/defectB"
-            os.makedirs(save_dir, exist_ok=True)
-
-            # Get username
-            username = getattr(self.controller.auth, "username", "guest").lower()
-
-            # Unique filename with timestamp
-            filename = f"{username}_{int(time.time())}.jpg"
-            filepath = os.path.join(save_dir, filename)
-
-            cv2.imwrite(filepath, self.current_frame)
-            messagebox.showinfo("Image Saved", f"Image saved as {filepath}")
+        """Show the newest frame from the camera service (never blocks on the device)."""
+        self._preview_job = None
+        if self.camera and self.camera.is_opened():
+            frame_id, frame = self.camera.latest()
+            if frame is not None:
+                self.current_frame = frame  # shared, read-only; kept for saving
+                # Aspect-preserving fit inside the label, skipped if the frame is unchanged
+                self.preview.render(frame, frame_id)
+
+            self._preview_job = self.after(33, self.update_frame)  # ~30 fps
+
+    def on_show(self):
+        """Called when the page is raised: load this group's model if needed."""
+        if self._status_job is None:
+            self._update_model_status()
 
     def stop_camera(self):
         """Stop the webcam feed and reset button."""
-        if self.cap:
-            self.cap.release()
-            self.cap = None
-        self.video_label.config(image="")  # Clear display
+        self.controller.scheduler.cancel(self.capture_job)  # results for a closed camera are stale
+        if self._preview_job is not None:
+            self.after_cancel(self._preview_job)
+            self._preview_job = None
+        release_camera(self.camera)
+        self.camera = None
+        self.current_frame = None
+        self.preview.clear()  # Clear display
 
         # Reset button text
         self.open_btn.config(text="Open Camera", command=self.start_camera)
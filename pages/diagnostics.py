@@ -0,0 +1,84 @@
+import os
+import tkinter as tk
+from tkinter import messagebox
+from metrics import METRICS_DIR, metrics
+
+REFRESH_MS = 1000
+EXPORT_DIR = METRICS_DIR or os.path.join("processed_results", "metrics")
+COLUMNS = ("Stage", "Count", "Last", "Mean", "p50", "p95", "p99")
+
+
+class DiagnosticsWindow(tk.Toplevel):
+    """Live table of per-stage timings (ms) from the shared metrics, refreshed every second."""
+    def __init__(self, master):
+        super().__init__(master, bg="#02517F")
+        self.title("Diagnostics")
+        self._refresh_job = None
+
+        tk.Label(self, text="Pipeline Timings (ms, last 1000 samples)", font=("Arial", 14, "bold"),
+                 bg="#02517F", fg="white").pack(pady=(10, 5))
+
+        self.table = tk.Frame(self, bg="#013B5C")
+        self.table.pack(fill="both", expand=True, padx=10, pady=5)
+        self._cells = {}  # (stage, column) -> Label, so refreshes only update text
+        self._stages = []  # stage shown on each row, top to bottom
+        for col, name in enumerate(COLUMNS):
+            tk.Label(self.table, text=name, font=("Arial", 11, "bold"), bg="#013B5C", fg="#A9D6F5",
+                     padx=10, anchor="e" if col else "w").grid(row=0, column=col, sticky="ew")
+
+        button_frame = tk.Frame(self, bg="#02517F")
+        button_frame.pack(pady=10)
+        tk.Button(button_frame, text="Export", command=self.export, font=("Arial", 11),
+                  bg="#029DF7", fg="white", width=10).pack(side="left", padx=5)
+        tk.Button(button_frame, text="Reset", command=self.reset, font=("Arial", 11),
+                  bg="#013B5C", fg="white", width=10).pack(side="left", padx=5)
+
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self.refresh()
+
+    def refresh(self):
+        self._refresh_job = None
+        snapshot = metrics.snapshot()
+        if list(snapshot) != self._stages:
+            self._layout(list(snapshot))
+        for stage, stats in snapshot.items():
+            values = (stage, stats["count"], stats["last"], stats["mean"],
+                      stats["p50"], stats["p95"], stats["p99"])
+            for col, value in enumerate(values):
+                text = f"{value:.1f}" if isinstance(value, float) else str(value)
+                self._cells[(stage, col)].config(text=text)
+        self._refresh_job = self.after(REFRESH_MS, self.refresh)
+
+    def _layout(self, stages):
+        """Re-grid every row: a new stage can land mid-table, since rows follow pipeline order."""
+        for (stage, col), cell in list(self._cells.items()):
+            if stage not in stages:
+                cell.destroy()
+                del self._cells[(stage, col)]
+        for row, stage in enumerate(stages, start=1):
+            for col in range(len(COLUMNS)):
+                cell = self._cells.get((stage, col))
+                if cell is None:
+                    cell = tk.Label(self.table, font=("Courier", 11), bg="#013B5C", fg="white",
+                                    padx=10, anchor="e" if col else "w")
+                    self._cells[(stage, col)] = cell
+                cell.grid(row=row, column=col, sticky="ew")
+        self._stages = stages
+
+    def export(self):
+        try:
+            prom_path, jsonl_path = metrics.export(EXPORT_DIR)
+        except OSError as e:
+            messagebox.showerror("Export", f"Failed to export metrics:\n{e}", parent=self)
+            return
+        messagebox.showinfo("Export", f"Wrote {prom_path}\nAppended {jsonl_path}", parent=self)
+
+    def reset(self):
+        metrics.reset()
+        self._layout([])
+
+    def close(self):
+        if self._refresh_job is not None:
+            self.after_cancel(self._refresh_job)
+            self._refresh_job = None
+        self.destroy()
@@ -1,5 +1,6 @@
 import tkinter as tk
 from tkinter import messagebox
+from pages.spinner import Spinner
 
 class Home(tk.Frame):
     def __init__(self, parent, controller):
@@ -47,7 +48,13 @@ class Home(tk.Frame):
             relief="flat", font=("Helvetica", 13, "bold"),
             width=15, height=2, bd=0
         )
-        self.login_btn.pack(pady=(0, 15))
+        self.login_btn.pack(pady=(0, 5))
+
+        # Spinner while the password is checked on the auth worker
+        self.status_label = tk.Label(self.form_frame, text="", font=("Helvetica", 11),
+                                     bg="#1E1E2F", fg="#A9A9B8")
+        self.status_label.pack(pady=(0, 10))
+        self.spinner = Spinner(self.status_label)
 
         # Register link
         link_frame = tk.Frame(self.form_frame, bg="#1E1E2F")
@@ -70,7 +77,26 @@ class Home(tk.Frame):
             messagebox.showerror("Error", "Please enter both username/email and password.")
             return
 
-        if self.controller.auth.login(identifier, password):
+        if self.spinner.running:
+            return  # a login is already being checked
+
+        # The KDF takes a few hundred ms; run it off the Tk thread
+        self.login_btn.config(state="disabled")
+        self.spinner.start("Signing in")
+        future = self.controller.auth.login_async(identifier, password)
+        future.add_done_callback(lambda f: self.after(0, self._login_done, f))
+
+    def _login_done(self, future):
+        self.spinner.stop()
+        self.login_btn.config(state="normal")
+        try:
+            ok = future.result()
+        except Exception as e:
+            messagebox.showerror("Login Failed", f"Could not check credentials:\n{e}")
+            return
+
+        if ok:
+            self.password_entry.delete(0, tk.END)
             self.controller.enable_post_login_nav()
             self.controller.show_frame("Profile")
         else:
@@ -1,8 +1,14 @@
 import tkinter as tk
 from tkinter import messagebox
-import json
 import os
-from db import load_user_history
+import threading
+import time
+from PIL import ImageTk
+from analytics import analytics
+from db import delete_user_history, history_store, subscribe_history
+from thumbnails import thumbnail_cache
+
+PREVIEW_SIZE = (320, 240)
 
 class Profile(tk.Frame):
     def __init__(self, parent, controller):
@@ -47,17 +53,76 @@ class Profile(tk.Frame):
                                     bg="#02517F", fg="white")
         self.email_label.pack(pady=5)
 
-        # Detection History
-        history_label = tk.Label(self, text="Detection History", font=("Arial", 16, "bold"),
+        tk.Button(self.info_frame, text="Defect Analytics", command=self.show_analytics,
+                  font=("Arial", 11), bg="#029DF7", fg="white").pack(pady=(5, 0))
+        self.analytics_window = None
+
+        # Detection History (title + filters)
+        history_header = tk.Frame(self, bg="#02517F")
+        history_header.grid(row=2, column=0, pady=(10, 5))
+
+        history_label = tk.Label(history_header, text="Detection History", font=("Arial", 16, "bold"),
                                  bg="#02517F", fg="white")
-        history_label.grid(row=2, column=0, pady=(10, 5))
+        history_label.pack()
+
+        filter_frame = tk.Frame(history_header, bg="#02517F")
+        filter_frame.pack(pady=(5, 0))
+
+        tk.Label(filter_frame, text="From (YYYY-MM-DD)", font=("Arial", 11),
+                 bg="#02517F", fg="white").pack(side="left", padx=(0, 5))
+        self.since_entry = tk.Entry(filter_frame, font=("Arial", 11), width=12)
+        self.since_entry.pack(side="left", padx=(0, 10))
+
+        tk.Label(filter_frame, text="To", font=("Arial", 11),
+                 bg="#02517F", fg="white").pack(side="left", padx=(0, 5))
+        self.until_entry = tk.Entry(filter_frame, font=("Arial", 11), width=12)
+        self.until_entry.pack(side="left", padx=(0, 10))
+
+        tk.Label(filter_frame, text="Defect", font=("Arial", 11),
+                 bg="#02517F", fg="white").pack(side="left", padx=(0, 5))
+        self.defect_var = tk.StringVar(value=self.ALL_DEFECTS)
+        self.defect_menu = tk.OptionMenu(filter_frame, self.defect_var, self.ALL_DEFECTS)
+        self.defect_menu.config(font=("Arial", 11), width=16)
+        self.defect_menu.pack(side="left", padx=(0, 10))
 
-        self.history_box = tk.Listbox(self, font=("Arial", 12), bg="#013B5C", fg="white",
-                                      selectbackground="#029DF7", activestyle="none")
-        self.history_box.grid(row=3, column=0, padx=20, pady=10, sticky="nsew")
+        tk.Button(filter_frame, text="Apply", command=self.apply_filters,
+                  font=("Arial", 11), bg="#029DF7", fg="white").pack(side="left", padx=(0, 5))
+        tk.Button(filter_frame, text="Clear", command=self.clear_filters,
+                  font=("Arial", 11), bg="#013B5C", fg="white").pack(side="left")
+
+        self.count_label = tk.Label(history_header, text="", font=("Arial", 10),
+                                    bg="#02517F", fg="#A9D6F5")
+        self.count_label.pack(pady=(5, 0))
+
+        # Listbox holds only the pages fetched so far; more load on scroll
+        list_frame = tk.Frame(self, bg="#02517F")
+        list_frame.grid(row=3, column=0, padx=20, pady=10, sticky="nsew")
+        list_frame.grid_rowconfigure(0, weight=1)
+        list_frame.grid_columnconfigure(0, weight=1)
+
+        self.history_scroll = tk.Scrollbar(list_frame, orient="vertical")
+        self.history_scroll.grid(row=0, column=1, sticky="ns")
+
+        self.history_box = tk.Listbox(list_frame, font=("Arial", 12), bg="#013B5C", fg="white",
+                                      selectbackground="#029DF7", activestyle="none",
+                                      yscrollcommand=self._on_history_scroll)
+        self.history_box.grid(row=0, column=0, sticky="nsew")
         self.history_box.bind("<Double-Button-1>", self.open_selected_history)
+        self.history_box.bind("<<ListboxSelect>>", self.preview_selected_history)
+        self.history_scroll.config(command=self.history_box.yview)
+
+        # Preview of the selected capture (from the thumbnail cache)
+        self.preview_label = tk.Label(list_frame, text="Select a capture to preview",
+                                      font=("Arial", 11), bg="#013B5C", fg="#A9D6F5",
+                                      width=PREVIEW_SIZE[0] // 8)
+        self.preview_label.grid(row=0, column=2, sticky="ns", padx=(10, 0))
+        self.preview_imgtk = None
 
         self.history_data = []
+        self._history_total = 0
+        self._filters = {}
+        self._shown = False
+        self._history_dirty = True
 
         # Logout button
         logout_btn = tk.Button(self, text="Logout", command=self.logout,
@@ -65,8 +130,8 @@ class Profile(tk.Frame):
                                width=12, height=2)
         logout_btn.grid(row=4, column=0, pady=20)
 
-        # Refresh history every 2 seconds
-        self.after(2000, self.refresh_history)
+        # History changes are pushed by db.save_user_history/delete_user_history
+        subscribe_history(self._on_history_event)
 
     def update_profile_info(self):
         user = getattr(self.controller.auth, "current_user", None)
@@ -75,25 +140,173 @@ class Profile(tk.Frame):
         self.username_label.config(text=f"Username: {username}")
         self.email_label.config(text=f"Email: {email}")
 
-    def refresh_history(self):
-        """Load user's detection history and update Listbox."""
+    def _current_email(self):
         user = getattr(self.controller.auth, "current_user", None)
-        if user:
-            email = user.get("email")
-            if email:
-                history_list = load_user_history(email)
-                # Sort newest first
-                history_list.sort(key=lambda r: r.get("timestamp", 0), reverse=True)
-
-                self.history_box.delete(0, tk.END)
-                self.history_data.clear()
-                for record in history_list:
-                    # Show only if both processed image and summary exist
-                    if os.path.exists(record.get("image_path", "")) and os.path.exists(record.get("summary_path", "")):
-                        self.history_box.insert(tk.END, record["name"])
-                        self.history_data.append(record)
-
-        self.after(2000, self.refresh_history)
+        return user.get("email") if user else None
+
+    def on_show(self):
+        """Called when the page is raised: catch up on changes made while hidden."""
+        self._shown = True
+        if self._history_dirty:
+            self.refresh_history()
+
+    def on_hide(self):
+        self._shown = False
+
+    # ---------------- Paging + filters ----------------
+    PAGE_SIZE = 50
+    ALL_DEFECTS = "All defects"
+
+    def _parse_date(self, text, end_of_day=False):
+        """YYYY-MM-DD → unix timestamp (local time), or None if blank."""
+        text = text.strip()
+        if not text:
+            return None
+        day = time.strptime(text, "%Y-%m-%d")
+        stamp = int(time.mktime(day))
+        return stamp + 86399 if end_of_day else stamp
+
+    def apply_filters(self):
+        """Read the filter widgets and reload from the first page."""
+        try:
+            since = self._parse_date(self.since_entry.get())
+            until = self._parse_date(self.until_entry.get(), end_of_day=True)
+        except ValueError:
+            messagebox.showerror("Filter", "Dates must look like 2025-01-31.")
+            return
+
+        defect = self.defect_var.get()
+        self._filters = {
+            "since": since,
+            "until": until,
+            "defect_class": None if defect == self.ALL_DEFECTS else defect,
+        }
+        self._apply_history([])
+        self.refresh_history()
+
+    def clear_filters(self):
+        self.since_entry.delete(0, tk.END)
+        self.until_entry.delete(0, tk.END)
+        self.defect_var.set(self.ALL_DEFECTS)
+        self.apply_filters()
+
+    def _update_defect_menu(self, email):
+        """Fill the defect filter with the classes present in this user's history."""
+        menu = self.defect_menu["menu"]
+        menu.delete(0, tk.END)
+        for name in [self.ALL_DEFECTS] + (history_store.defect_classes(email) if email else []):
+            menu.add_command(label=name, command=lambda n=name: self.defect_var.set(n))
+
+    def _update_count_label(self):
+        if self._history_total:
+            self.count_label.config(text=f"Showing {len(self.history_data)} of {self._history_total}")
+        else:
+            filtered = any(self._filters.values())
+            self.count_label.config(text="No captures match the filters" if filtered else "No captures yet")
+
+    def refresh_history(self):
+        """Reload the pages already on screen (at least one) and diff them into the Listbox."""
+        email = self._current_email()
+        if email:
+            # Newest first; missing files are handled when a record is opened
+            limit = max(self.PAGE_SIZE, len(self.history_data))
+            history_list = history_store.query(email, limit=limit, **self._filters)
+            self._history_total = history_store.count(email, **self._filters)
+            self._update_defect_menu(email)
+        else:
+            history_list = []
+            self._history_total = 0
+        self._apply_history(history_list)
+        self._update_count_label()
+        self._history_dirty = False
+
+    def _load_more(self):
+        """Fetch the next page and append it."""
+        email = self._current_email()
+        if not email or len(self.history_data) >= self._history_total:
+            return
+        page = history_store.query(email, limit=self.PAGE_SIZE, offset=len(self.history_data),
+                                   **self._filters)
+        known = {r["id"] for r in self.history_data}
+        for record in page:
+            if record["id"] not in known:
+                self.history_data.append(record)
+                self.history_box.insert(tk.END, record["name"])
+        self._update_count_label()
+
+    def _on_history_scroll(self, first, last):
+        """Listbox yscrollcommand: move the scrollbar, fetch more near the bottom."""
+        self.history_scroll.set(first, last)
+        if float(last) > 0.9 and len(self.history_data) < self._history_total:
+            self.after_idle(self._load_more)
+
+    def _apply_history(self, records):
+        """Diff `records` (newest first) against the Listbox: delete gone rows, insert new ones."""
+        new_ids = [r["id"] for r in records]
+        if new_ids == [r["id"] for r in self.history_data]:
+            return
+
+        keep = set(new_ids)
+        for idx in reversed(range(len(self.history_data))):
+            if self.history_data[idx]["id"] not in keep:
+                self.history_data.pop(idx)
+                self.history_box.delete(idx)
+
+        for pos, record in enumerate(records):
+            if pos >= len(self.history_data) or self.history_data[pos]["id"] != record["id"]:
+                self.history_data.insert(pos, record)
+                self.history_box.insert(pos, record["name"])
+
+    def _on_history_event(self, event, email, record):
+        """db observer; may run on the writer thread, so hop onto the Tk thread."""
+        try:
+            self.after(0, self._handle_history_event, event, email, record)
+        except RuntimeError:
+            pass  # window already destroyed
+
+    def _handle_history_event(self, event, email, record):
+        if email != self._current_email():
+            return
+        if not self._shown:
+            self._history_dirty = True  # refreshed on next on_show()
+            return
+
+        if event == "added" and any(self._filters.values()):
+            # Let the store decide whether it matches the filters
+            self.refresh_history()
+        elif event == "added":
+            # Newest first: a new capture normally belongs at the top
+            pos = 0
+            while pos < len(self.history_data) and \
+                    self.history_data[pos].get("timestamp", 0) > record.get("timestamp", 0):
+                pos += 1
+            self.history_data.insert(pos, record)
+            self.history_box.insert(pos, record["name"])
+            self._history_total += 1
+            self._update_count_label()
+        elif event == "removed":
+            for idx, existing in enumerate(self.history_data):
+                if existing["id"] == record["id"]:
+                    self.history_data.pop(idx)
+                    self.history_box.delete(idx)
+                    self._history_total = max(0, self._history_total - 1)
+                    self._update_count_label()
+                    break
+
+    def preview_selected_history(self, event=None):
+        """Show a small preview of the selected capture."""
+        idx = self.history_box.curselection()
+        if not idx:
+            return
+        record = self.history_data[idx[0]]
+
+        thumb = thumbnail_cache.get(record.get("image_path", ""), PREVIEW_SIZE)
+        if thumb is None:
+            self.preview_imgtk = None
+            self.preview_label.config(image="", text="Preview not available", width=PREVIEW_SIZE[0] // 8)
+            return
+        self.preview_imgtk = ImageTk.PhotoImage(thumb)
+        self.preview_label.config(image=self.preview_imgtk, text="", width=PREVIEW_SIZE[0])
 
     def open_selected_history(self, event=None):
         """Open selected history item in DefectResult page."""
@@ -104,27 +317,67 @@ class Profile(tk.Frame):
         record = self.history_data[idx]
 
         if not (os.path.exists(record.get("image_path", "")) and os.path.exists(record.get("summary_path", ""))):
-            # Remove invalid entry
-            email = getattr(self.controller.auth.current_user, "email", None)
-            if email:
-                self.history_data.pop(idx)
-                self.history_box.delete(idx)
-                os.makedirs("user_history", exist_ok=True)
-                history_file = os.path.join("user_history", f"{email}.json")
-                with open(history_file, "w") as f:
-                    json.dump(self.history_data, f, indent=4)
+            # Remove invalid entry (the Listbox row goes via the "removed" notification)
+            delete_user_history(self._current_email(), record["id"])
+            messagebox.showwarning("History", "The files for this capture no longer exist.")
             return
 
         # Load image + summary into DefectResult page
-        result_page = self.controller.frames.get("DefectResult")
-        if result_page:
-            result_page.set_paths(record["image_path"], record["summary_path"])
-            result_page.current_image = result_page.imgtk
-            self.controller.show_frame("DefectResult")
+        result_page = self.controller.get_frame("DefectResult")
+        result_page.set_paths(record["image_path"], record["summary_path"])
+        result_page.current_image = result_page.imgtk
+        self.controller.show_frame("DefectResult")
+
+    # ---------------- Analytics ----------------
+    def show_analytics(self):
+        """Open (or raise) the analytics window and refresh it in the background."""
+        email = self._current_email()
+        if not email:
+            return
+
+        if self.analytics_window is None or not self.analytics_window.winfo_exists():
+            self.analytics_window = tk.Toplevel(self, bg="#02517F")
+            self.analytics_window.title("Defect Analytics")
+            self.analytics_text = tk.Text(self.analytics_window, font=("Courier", 11), bg="#013B5C",
+                                          fg="white", width=60, height=32, relief="flat")
+            self.analytics_text.pack(fill="both", expand=True, padx=10, pady=10)
+        self.analytics_window.lift()
+        self._set_analytics_text("Indexing summaries...")
+
+        def _work():
+            # Only summaries not seen before are read; the rest is pre-aggregated
+            try:
+                analytics.ingest()
+                text = analytics.report(email)
+            except Exception as e:
+                text = f"Analytics unavailable: {e}"
+            try:
+                self.after(0, self._set_analytics_text, text)
+            except RuntimeError:
+                pass  # window already destroyed
+
+        threading.Thread(target=_work, daemon=True).start()
+
+    def _set_analytics_text(self, text):
+        if self.analytics_window is None or not self.analytics_window.winfo_exists():
+            return
+        self.analytics_text.config(state="normal")
+        self.analytics_text.delete("1.0", tk.END)
+        self.analytics_text.insert("1.0", text)
+        self.analytics_text.config(state="disabled")
 
     def logout(self):
         confirm = messagebox.askyesno("Logout", "Are you sure you want to log out?")
         if confirm:
             self.controller.auth.logout()
+            self._apply_history([])
+            self._history_total = 0
+            self._filters = {}
+            self.since_entry.delete(0, tk.END)
+            self.until_entry.delete(0, tk.END)
+            self.defect_var.set(self.ALL_DEFECTS)
+            self._history_dirty = True
+            if self.analytics_window is not None and self.analytics_window.winfo_exists():
+                self.analytics_window.destroy()
             self.controller.disable_post_logout_nav()
             self.controller.show_frame("Home")
@@ -1,4 +1,5 @@
 import tkinter as tk
+from pages.spinner import Spinner
 
 class Register(tk.Frame):
     def __init__(self, parent, controller):
@@ -33,6 +34,7 @@ class Register(tk.Frame):
             font=("Helvetica", 11)
         )
         self.message_label.pack()
+        self.spinner = Spinner(self.message_label)
 
         # === FORM FRAME ===
         form_frame = tk.Frame(self, bg="#1E1E2F")
@@ -88,7 +90,7 @@ class Register(tk.Frame):
         dropdown.pack(fill="x", ipady=input_ipady-4)
 
         # === REGISTER BUTTON ===
-        register_btn = tk.Button(
+        self.register_btn = tk.Button(
             self,
             text="Register",
             command=self.attempt_register,
@@ -97,7 +99,7 @@ class Register(tk.Frame):
             relief="flat", font=("Helvetica", 13, "bold"),
             width=15, height=2, bd=0
         )
-        register_btn.pack(pady=(0, 10))
+        self.register_btn.pack(pady=(0, 10))
 
         # === LOGIN LINK TEXT (centered) ===
         link_frame = tk.Frame(self, bg="#1E1E2F")
@@ -129,8 +131,24 @@ class Register(tk.Frame):
             self.message_label.config(text="All fields are required.", fg="red")
             return
 
-        # ✅ Pass username into auth.register
-        success, message = self.controller.auth.register(username, email, password, user_type)
+        if self.spinner.running:
+            return
+
+        # Hashing the password is slow on purpose; do it on the auth worker
+        self.register_btn.config(state="disabled")
+        self.message_label.config(fg="#A9A9B8")
+        self.spinner.start("Creating account")
+        future = self.controller.auth.register_async(username, email, password, user_type)
+        future.add_done_callback(lambda f: self.after(0, self._register_done, f))
+
+    def _register_done(self, future):
+        self.spinner.stop()
+        self.register_btn.config(state="normal")
+        try:
+            success, message = future.result()
+        except Exception as e:
+            success, message = False, f"Registration failed: {e}"
+
         if success:
             self.message_label.config(text=message, fg="green")
             self.controller.show_frame("Home")
@@ -1,7 +1,19 @@
 import customtkinter as ctk
 from PIL import Image, ImageTk
-import json
+import numpy as np
 import os
+from collections import OrderedDict
+from groups import DEFAULT_GROUP, GROUPS, get_group
+from summaries import read_summary
+from thumbnails import thumbnail_cache
+
+# Largest size DefectResult ever shows; cached copies are scaled to this once
+DISPLAY_SIZE = (1920, 1440)
+
+# Resizing: wait for <Configure> events to stop, and keep a few renders around
+RESIZE_DEBOUNCE_MS = 120
+SIZE_BUCKET = 16
+MAX_RENDERED_SIZES = 8
 
 
 class DefectResult(ctk.CTkFrame):
@@ -11,6 +23,10 @@ class DefectResult(ctk.CTkFrame):
         self.image_path = None
         self.result_path = None
         self.imgtk = None
+        self.group = DEFAULT_GROUP
+        self._legend_group = None
+        self._resize_job = None
+        self._rendered = OrderedDict()  # size bucket -> PhotoImage of original_img
 
         # ---------------- Grid configuration ----------------
         self.grid_rowconfigure(1, weight=1)
@@ -75,37 +91,19 @@ class DefectResult(ctk.CTkFrame):
         right_frame.grid(row=0, column=1, sticky="nsew", padx=10, pady=10)
         right_frame.grid_rowconfigure(1, weight=1)  # result box expands
 
-        # --- Legend Box ---
-        legend_frame = ctk.CTkFrame(right_frame, fg_color="white", corner_radius=10)
-        legend_frame.grid(row=0, column=0, sticky="ew", pady=(0, 10))
+        # --- Legend Box (rows filled per inspection group) ---
+        self.legend_frame = ctk.CTkFrame(right_frame, fg_color="white", corner_radius=10)
+        self.legend_frame.grid(row=0, column=0, sticky="ew", pady=(0, 10))
 
-        legend_title = ctk.CTkLabel(
-            legend_frame,
+        self.legend_title = ctk.CTkLabel(
+            self.legend_frame,
             text="Legend:",
             font=ctk.CTkFont(family="Arial", size=14, weight="bold"),
             text_color="black"
         )
-        legend_title.pack(anchor="w", padx=10, pady=(5, 2))
-
-        legends = [
-            ("A", "Broken Traces", "#FF0000"),
-            ("B", "Short Circuits", "#00AA00"),
-            ("C", "90 Degree Angle", "#0000FF"),
-        ]
-        for letter, desc, color in legends:
-            row = ctk.CTkFrame(legend_frame, fg_color="white")
-            row.pack(anchor="w", padx=10, pady=2, fill="x")
-
-            color_box = ctk.CTkLabel(row, text=" ", width=15, height=15, fg_color=color, corner_radius=3)
-            color_box.pack(side="left", padx=(0, 5))
-
-            text_label = ctk.CTkLabel(
-                row,
-                text=f"{letter} = {desc}",
-                font=ctk.CTkFont(family="Arial", size=12),
-                text_color="black"
-            )
-            text_label.pack(side="left")
+        self.legend_title.pack(anchor="w", padx=10, pady=(5, 2))
+        self._legend_rows = []
+        self._show_legend(self.group)
 
         # --- Result text ---
         self.result_label = ctk.CTkTextbox(
@@ -134,59 +132,156 @@ class DefectResult(ctk.CTkFrame):
         # Bind resize event
         self.image_label.bind("<Configure>", self._resize_image)
 
+    def _show_legend(self, group_key):
+        """Rebuild the legend rows from the group's class and color maps."""
+        if group_key == self._legend_group:
+            return
+        for row in self._legend_rows:
+            row.destroy()
+        self._legend_rows = []
+
+        group = get_group(group_key)
+        self.legend_title.configure(text=f"Legend ({group.title}):")
+        for letter, desc, bgr in group.legend():
+            b, g, r = bgr or (0, 255, 255)
+            row = ctk.CTkFrame(self.legend_frame, fg_color="white")
+            row.pack(anchor="w", padx=10, pady=2, fill="x")
+
+            color_box = ctk.CTkLabel(row, text=" ", width=15, height=15,
+                                     fg_color=f"#{r:02X}{g:02X}{b:02X}", corner_radius=3)
+            color_box.pack(side="left", padx=(0, 5))
+
+            text_label = ctk.CTkLabel(
+                row,
+                text=f"{letter} = {desc}",
+                font=ctk.CTkFont(family="Arial", size=12),
+                text_color="black"
+            )
+            text_label.pack(side="left")
+            self._legend_rows.append(row)
+        self._legend_group = group_key
+
     def set_paths(self, image_path, result_path):
         self.image_path = image_path
         self.result_path = result_path
         self.load_result()
 
+    def set_result(self, image, detections, image_path=None, result_path=None, group=None):
+        """
+        Show an in-memory result (BGR NumPy image + detections list) without
+        reading anything from disk. The paths are kept for later reloads.
+        """
+        self.image_path = image_path
+        self.result_path = result_path
+        self.group = group or DEFAULT_GROUP
+        self._show_legend(self.group)
+
+        rgb = np.ascontiguousarray(image[:, :, ::-1])
+        self._set_image(Image.fromarray(rgb))
+        self.image_label.configure(text="")
+
+        self._show_detections(detections)
+
     def load_result(self):
         # Load processed image
         if self.image_path and os.path.exists(self.image_path):
-            try:
-                self.original_img = Image.open(self.image_path)
-                self._resize_image()
+            # Display-sized copy from the thumbnail cache, not a full decode
+            img = thumbnail_cache.get(self.image_path, DISPLAY_SIZE)
+            if img is not None:
+                self._set_image(img)
                 self.image_label.configure(text="")
-            except Exception:
+            else:
                 self.image_label.configure(text="Processed image not available")
         else:
             self.image_label.configure(text="Processed image not available")
 
-        # Load detection results
-        self.result_label.configure(state="normal")
-        self.result_label.delete("1.0", "end")
-
+        # Load detection results; the summary also says which group made them
+        data = None
         result_text = ""
+        self.group = DEFAULT_GROUP
         if self.result_path and os.path.exists(self.result_path):
             try:
-                with open(self.result_path, "r") as f:
-                    data = json.load(f)
-
-                if data:
-                    result_lines = [
-                        f"{d.get('id', '?')} - {d.get('class', 'unknown')} ({d.get('confidence', 0)*100:.1f}%)"
-                        for d in data
-                    ]
-                    result_text = "\n".join(result_lines)
-                else:
-                    result_text = "No detections found."
+                summary = read_summary(self.result_path)
+                data = summary.get("detections", [])
+                group = (summary.get("model") or {}).get("group")
+                self.group = group if group in GROUPS else DEFAULT_GROUP
             except Exception:
                 result_text = "Error reading results."
         else:
             result_text = "No results file found."
+        self._show_legend(self.group)
+
+        self._show_detections(data, result_text)
+
+    def _show_detections(self, data, fallback_text=""):
+        """Fill the result box from a detections list (or show `fallback_text`)."""
+        self.result_label.configure(state="normal")
+        self.result_label.delete("1.0", "end")
+
+        if data is None:
+            result_text = fallback_text
+        elif data:
+            try:
+                result_lines = [
+                    f"{d.get('id', '?')} - {d.get('class', 'unknown')} ({d.get('confidence', 0)*100:.1f}%)"
+                    for d in data
+                ]
+                result_text = "\n".join(result_lines)
+            except Exception:
+                result_text = "Error reading results."
+        else:
+            result_text = "No detections found."
 
         self.result_label.insert("1.0", result_text)
         self.result_label.configure(state="disabled")
 
+    def _set_image(self, img):
+        """Replace the displayed image; renders of the previous one are dropped."""
+        self.original_img = img
+        self._rendered.clear()
+        self._resize_image()
+
     def _resize_image(self, event=None):
-        """Resize image dynamically to fit inside the left frame."""
+        """
+        Resize image dynamically to fit inside the left frame.
+        <Configure> events are debounced so dragging the window edge only
+        rescales once the geometry settles.
+        """
+        if self._resize_job is not None:
+            self.after_cancel(self._resize_job)
+            self._resize_job = None
+
+        if event is not None:
+            self._resize_job = self.after(RESIZE_DEBOUNCE_MS, self._render_image)
+        else:
+            self._render_image()
+
+    def _render_image(self):
+        """Show original_img fitted to the label, reusing earlier renders of the same size bucket."""
+        self._resize_job = None
         if hasattr(self, "original_img"):
             w, h = self.image_label.winfo_width(), self.image_label.winfo_height()
             if w > 10 and h > 10:  # avoid errors before layout stabilizes
-                resized = self.original_img.copy()
-                resized.thumbnail((w-10, h-10))  # small margin
-                self.imgtk = ImageTk.PhotoImage(resized)
-                self.image_label.configure(image=self.imgtk)
+                # small margin, rounded down so nearby sizes share one render
+                bucket = ((w - 10) // SIZE_BUCKET * SIZE_BUCKET, (h - 10) // SIZE_BUCKET * SIZE_BUCKET)
+                if min(bucket) <= 0:
+                    return
+
+                imgtk = self._rendered.get(bucket)
+                if imgtk is None:
+                    resized = self.original_img.copy()
+                    resized.thumbnail(bucket)
+                    imgtk = ImageTk.PhotoImage(resized)
+                    self._rendered[bucket] = imgtk
+                    while len(self._rendered) > MAX_RENDERED_SIZES:
+                        self._rendered.popitem(last=False)
+                else:
+                    self._rendered.move_to_end(bucket)
+
+                if imgtk is not self.imgtk:
+                    self.imgtk = imgtk
+                    self.image_label.configure(image=self.imgtk)
 
     def go_back(self):
         if self.controller:
-            self.controller.show_frame("DefectA")
+            self.controller.show_frame(get_group(self.group).page)
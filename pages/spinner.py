@@ -0,0 +1,33 @@
+import tkinter as tk
+
+FRAMES = "◐◓◑◒"
+INTERVAL_MS = 120
+
+
+class Spinner:
+    """Animates "<text> ◐" in a Label while background work runs."""
+    def __init__(self, label: tk.Label):
+        self.label = label
+        self._text = ""
+        self._index = 0
+        self._job = None
+
+    def start(self, text: str) -> None:
+        self._text = text
+        if self._job is None:
+            self._tick()
+
+    def _tick(self) -> None:
+        self.label.config(text=f"{self._text} {FRAMES[self._index % len(FRAMES)]}")
+        self._index += 1
+        self._job = self.label.after(INTERVAL_MS, self._tick)
+
+    def stop(self, text: str = "") -> None:
+        if self._job is not None:
+            self.label.after_cancel(self._job)
+            self._job = None
+        self.label.config(text=text)
+
+    @property
+    def running(self) -> bool:
+        return self._job is not None
@@ -1,140 +1,445 @@
-import cv2
-import os
-import numpy as np
-from ultralytics import YOLO
-
-# Load YOLO model once
-MODEL_PATH = "defect_8.pt"
-model = YOLO(MODEL_PATH)
-
-# Mapping from YOLO class → (short label, full description)
-CLASS_MAP = {
-    "open": ("A", "Broken Traces"),
-    "short": ("B", "Short Circuits"),
-    "90-degree": ("C", "90 Degree Angle"),
-}
-
-# Colors for each class (BGR format for OpenCV)
-COLOR_MAP = {
-    "A": (0, 0, 255),     # Red for Broken Traces
-    "B": (0, 255, 0),     # Green for Short Circuits
-    "C": (255, 0, 0),     # Blue for 90 Degree Angle
-}
-
-
-def draw_annotations(image, result, show_confidence=False):
-    """
-    Draw incremental letter+number annotations (A1, A2, B1, …),
-    auto-adjusted outside bounding boxes.
-    """
-    detections = []
-    ih, iw = image.shape[:2]
-
-    # Counter for each class (A, B, C …)
-    class_counters = {k: 0 for k, _ in CLASS_MAP.values()}
-
-    if result.boxes is None:
-        return image, detections
-
-    for box in result.boxes:
-        cls_id = int(box.cls[0])
-        conf = float(box.conf[0])
-        label = result.names[cls_id]
-
-        # Normalize label to match CLASS_MAP keys
-        norm_label = label.strip().lower()
-
-        # Map to letter + full description
-        short_label, full_label = CLASS_MAP.get(norm_label, ("?", label))
-
-        # Increment class counter
-        class_counters[short_label] += 1
-        numbered_label = f"{short_label}{class_counters[short_label]}"
-
-        # Pick color (default yellow if not found)
-        color = COLOR_MAP.get(short_label, (0, 255, 255))
-
-        # Coordinates
-        x1, y1, x2, y2 = map(int, box.xyxy[0])
-        x1, y1 = max(0, x1), max(0, y1)
-        x2, y2 = min(iw - 1, x2), min(ih - 1, y2)
-
-        # Draw bounding box
-        cv2.rectangle(image, (x1, y1), (x2, y2), color, 2)
-
-        # Prepare font + text size
-        font = cv2.FONT_HERSHEY_SIMPLEX
-        text_label = numbered_label
-        if show_confidence:
-            text_label += f" ({conf*100:.1f}%)"
-
-        text_size, _ = cv2.getTextSize(text_label, font, 1.0, 2)
-        text_w, text_h = text_size
-
-        # Try placing above; if not enough space, place below
-        if y1 - text_h - 5 >= 0:
-            text_x = x1
-            text_y = y1 - 5
-        else:
-            text_x = x1
-            text_y = y2 + text_h + 5
-
-        # Draw the label
-        cv2.putText(
-            image,
-            text_label,
-            (text_x, text_y),
-            font,
-            1.0,
-            color,
-            2,
-            cv2.LINE_AA,
-        )
-
-        # Save detection for summary
-        detections.append({
-            "id": numbered_label,
-            "class": full_label,
-            "confidence": round(conf, 2),
-            "bbox": [x1, y1, x2, y2],
-        })
-
-    return image, detections
-
-
-def analyze_image(image_path: str, save_dir: str = "processed_results", show_confidence=False):
-    """
-    Run YOLO prediction on a single image and save annotated result.
-    Returns the path to the annotated image and a summary dictionary.
-    """
-    os.makedirs(save_dir, exist_ok=True)
-
-    results = model.predict(image_path, conf=0.3, imgsz=320, verbose=False)
-    if not results:
-        raise ValueError("No results returned by YOLO.")
-
-    result = results[0]
-
-    # Load original image
-    img = cv2.imread(image_path)
-    if img is None:
-        raise ValueError(f"Failed to load {image_path}")
-
-    # Draw custom annotations (letters+index or with confidence if enabled)
-    annotated, detections = draw_annotations(img, result, show_confidence=show_confidence)
-
-    # Save processed image
-    filename = os.path.basename(image_path)
-    processed_path = os.path.join(save_dir, f"processed_{filename}")
-    success = cv2.imwrite(processed_path, annotated)
-    if not success:
-        raise IOError(f"Failed to save processed image at {processed_path}")
-
-    # Build summary (full text descriptions)
-    summary = {
-        "file": image_path,
-        "processed_file": processed_path,
-        "detections": detections,
-    }
-
-    return processed_path, summary
+import cv2
+import hashlib
+import os
+import time
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional
+
+from metrics import metrics
+# Per-group weights/labels live in groups.py; CLASS_MAP/COLOR_MAP/MODEL_PATH are group A's
+from groups import CLASS_MAP, COLOR_MAP, MODEL_PATH, get_group
+
+
+class ModelRegistry:
+    """
+    Loads YOLO weights lazily and hands the same instance to every caller.
+    Loading happens on first get() or in a background warm-up thread, so
+    importing this module no longer blocks on the weights.
+    Models are keyed by weights path, so each inspection group (see
+    groups.py) loads once and switching pages never reloads weights.
+    """
+    IDLE = "idle"
+    LOADING = "loading"
+    READY = "ready"
+    FAILED = "failed"
+
+    def __init__(self):
+        self._models = {}
+        self._states = {}
+        self._errors = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: str = MODEL_PATH):
+        """Return the shared model for `path`, loading it if needed."""
+        model = self._models.get(path)
+        if model is not None:
+            return model
+
+        with self._lock:
+            # Another thread may have finished loading while we waited
+            model = self._models.get(path)
+            if model is not None:
+                return model
+
+            self._states[path] = self.LOADING
+            try:
+                from ultralytics import YOLO  # heavy import, deferred until needed
+                model = YOLO(path)
+            except Exception as e:
+                self._states[path] = self.FAILED
+                self._errors[path] = e
+                raise
+
+            self._models[path] = model
+            self._states[path] = self.READY
+            self._errors.pop(path, None)
+            return model
+
+    def warm_up(self, path: str = MODEL_PATH) -> None:
+        """Start loading `path` in a daemon thread (no-op if already loaded/loading)."""
+        if self._states.get(path) in (self.LOADING, self.READY):
+            return
+        self._states[path] = self.LOADING
+
+        def _load():
+            try:
+                self.get(path)
+            except Exception:
+                pass  # state/error are recorded by get()
+
+        threading.Thread(target=_load, name="model-warmup", daemon=True).start()
+
+    def state(self, path: str = MODEL_PATH) -> str:
+        """One of IDLE, LOADING, READY, FAILED."""
+        return self._states.get(path, self.IDLE)
+
+    def error(self, path: str = MODEL_PATH):
+        """Exception raised by the last failed load of `path`, if any."""
+        return self._errors.get(path)
+
+
+# Shared registry used by every page
+registry = ModelRegistry()
+
+
+@lru_cache(maxsize=None)
+def model_version(path: str = MODEL_PATH) -> str:
+    """Weights file name plus a short content hash, recorded in summaries."""
+    digest = hashlib.sha1()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    except OSError:
+        return os.path.basename(path)
+    return f"{os.path.basename(path)}@{digest.hexdigest()[:12]}"
+
+
+def get_model(group=None):
+    """Return the shared YOLO model of `group` (default group if None; loads on first call)."""
+    return registry.get(get_group(group).model_path)
+
+
+def warm_up_model(group=None) -> None:
+    """Begin loading the model of `group` in the background."""
+    registry.warm_up(get_group(group).model_path)
+
+
+def model_state(group=None) -> str:
+    """Load state of the model of `group`, for display in the UI."""
+    return registry.state(get_group(group).model_path)
+
+
+def model_error(group=None):
+    """Exception from the last failed load of the model of `group`, if any."""
+    return registry.error(get_group(group).model_path)
+
+
+ANNOTATION_FONT = cv2.FONT_HERSHEY_SIMPLEX
+DEFAULT_COLOR = (0, 255, 255)  # yellow for unknown classes
+
+
+@lru_cache(maxsize=1024)
+def _text_size(text: str):
+    """cv2.getTextSize for the annotation font, cached per label string."""
+    (text_w, text_h), _ = cv2.getTextSize(text, ANNOTATION_FONT, 1.0, 2)
+    return text_w, text_h
+
+
+def boxes_to_arrays(result):
+    """
+    Pull a YOLO result's boxes out as NumPy arrays in one go.
+    Returns (labels, confs, xyxy): raw class names (object array), float
+    confidences and integer corner coordinates, one row per box.
+    """
+    boxes = result.boxes
+    if boxes is None or len(boxes) == 0:
+        return np.empty(0, dtype=object), np.empty(0, dtype=np.float32), np.empty((0, 4), dtype=int)
+
+    cls_ids = boxes.cls.cpu().numpy().astype(int)
+    confs = boxes.conf.cpu().numpy()
+    xyxy = boxes.xyxy.cpu().numpy().astype(int)
+
+    names = result.names
+    name_table = np.array([names.get(i, str(i)) for i in range(cls_ids.max() + 1)], dtype=object)
+    return name_table[cls_ids], confs, xyxy
+
+
+def draw_boxes(image, labels, confs, xyxy, show_confidence=False, group=None):
+    """
+    Draw incremental letter+number annotations (A1, A2, B1, …) for boxes
+    given as arrays (see boxes_to_arrays), auto-adjusted outside bounding boxes.
+    Labels and colors come from `group`'s class/color maps.
+    Returns (image, detections).
+    """
+    detections = []
+    if len(labels) == 0:
+        return image, detections
+
+    ih, iw = image.shape[:2]
+    class_map, color_map = get_group(group).class_map, get_group(group).color_map
+
+    # Map each distinct class once: normalized YOLO label → (letter, description)
+    unique_labels, inverse = np.unique(labels.astype(str), return_inverse=True)
+    mapped = [class_map.get(label.strip().lower(), ("?", label)) for label in unique_labels]
+    short_labels = np.array([m[0] for m in mapped], dtype=object)[inverse]
+    full_labels = np.array([m[1] for m in mapped], dtype=object)[inverse]
+
+    # Per-class running number, in box order
+    numbers = np.zeros(len(labels), dtype=int)
+    for short in set(short_labels):
+        mask = short_labels == short
+        numbers[mask] = np.arange(1, int(mask.sum()) + 1)
+
+    # Clip coordinates to the image
+    xyxy = xyxy.copy()
+    xyxy[:, :2] = np.maximum(xyxy[:, :2], 0)
+    xyxy[:, 2] = np.minimum(xyxy[:, 2], iw - 1)
+    xyxy[:, 3] = np.minimum(xyxy[:, 3], ih - 1)
+
+    for (x1, y1, x2, y2), short, full, number, conf in zip(
+            xyxy.tolist(), short_labels, full_labels, numbers.tolist(), confs.tolist()):
+        numbered_label = f"{short}{number}"
+        color = color_map.get(short, DEFAULT_COLOR)
+
+        # Draw bounding box
+        cv2.rectangle(image, (x1, y1), (x2, y2), color, 2)
+
+        text_label = numbered_label
+        if show_confidence:
+            text_label += f" ({conf*100:.1f}%)"
+        _, text_h = _text_size(text_label)
+
+        # Try placing above; if not enough space, place below
+        if y1 - text_h - 5 >= 0:
+            text_y = y1 - 5
+        else:
+            text_y = y2 + text_h + 5
+
+        cv2.putText(image, text_label, (x1, text_y), ANNOTATION_FONT, 1.0, color, 2, cv2.LINE_AA)
+
+        # Save detection for summary
+        detections.append({
+            "id": numbered_label,
+            "class": full,
+            "confidence": round(conf, 2),
+            "bbox": [x1, y1, x2, y2],
+        })
+
+    return image, detections
+
+
+def draw_annotations(image, result, show_confidence=False, group=None):
+    """
+    Draw incremental letter+number annotations (A1, A2, B1, …),
+    auto-adjusted outside bounding boxes.
+    """
+    labels, confs, xyxy = boxes_to_arrays(result)
+    return draw_boxes(image, labels, confs, xyxy, show_confidence=show_confidence, group=group)
+
+
+PREDICT_CONF = 0.3
+PREDICT_IMGSZ = 320
+DEFAULT_BATCH_SIZE = 8
+
+
+def _build_summary(source, processed_path, detections, image, timings, group=None):
+    """Per-image summary returned by the analyze_* functions."""
+    h, w = image.shape[:2]
+    model_path = get_group(group).model_path
+    return {
+        "file": source,
+        "processed_file": processed_path,
+        "detections": detections,
+        "image_size": (w, h),
+        "model_path": model_path,
+        "model_version": model_version(model_path),
+        "group": get_group(group).key,
+        "timings_ms": timings,
+    }
+
+
+def _annotate_and_save(img, boxes, source, name, save_dir, show_confidence=False, timings=None,
+                       group=None):
+    """Annotate `img` with `boxes` (see boxes_to_arrays), write it to `save_dir` and build the summary."""
+    timings = dict(timings or {})
+
+    # Draw custom annotations (letters+index or with confidence if enabled)
+    started = time.perf_counter()
+    annotated, detections = draw_boxes(img, *boxes, show_confidence=show_confidence, group=group)
+    timings["annotation"] = (time.perf_counter() - started) * 1000
+
+    # Save processed image
+    processed_path = os.path.join(save_dir, f"processed_{name}")
+    _write_image(processed_path, annotated, timings)
+    metrics.record_timings(timings)
+
+    # Build summary (full text descriptions)
+    return processed_path, _build_summary(source, processed_path, detections, annotated, timings, group)
+
+
+# ---------------- Background persistence ----------------
+# A single writer thread: jobs run in submission order, so a job submitted
+# after an image write can rely on that file existing.
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="result-writer")
+
+
+def submit_write(fn, *args, **kwargs):
+    """Run `fn(*args, **kwargs)` on the background writer. Returns a Future."""
+    return _writer.submit(fn, *args, **kwargs)
+
+
+def _write_image(path, image, timings=None):
+    """
+    Encode and write `image`, timing the two halves separately. With
+    `timings` the "encode"/"save" milliseconds go there; otherwise they are
+    recorded straight into metrics.
+    """
+    started = time.perf_counter()
+    ok, buffer = cv2.imencode(os.path.splitext(path)[1] or ".jpg", image)
+    if not ok:
+        raise IOError(f"Failed to encode image for {path}")
+    encoded = time.perf_counter()
+    buffer.tofile(path)
+    stages = {"encode": (encoded - started) * 1000, "save": (time.perf_counter() - encoded) * 1000}
+
+    if timings is None:
+        metrics.record_timings(stages)
+    else:
+        timings.update(stages)
+    return path
+
+
+def write_image_async(path: str, image: np.ndarray):
+    """Encode and save `image` on the background writer. Returns a Future."""
+    return submit_write(_write_image, path, image)
+
+
+# Ultralytics models are not safe to call from several threads at once.
+# Decode, annotation and encoding still run in parallel; only predict() is
+# serialized, per model, so different groups can infer at the same time.
+_inference_locks = {}
+_inference_locks_guard = threading.Lock()
+
+
+def _run_model(source, group=None):
+    """model.predict() on one image or a list of images, one caller per model at a time."""
+    path = get_group(group).model_path
+    model = registry.get(path)
+    with _inference_locks_guard:
+        lock = _inference_locks.setdefault(path, threading.Lock())
+    with lock:
+        return model.predict(source, conf=PREDICT_CONF, imgsz=PREDICT_IMGSZ, verbose=False)
+
+
+def predict_frame(frame: np.ndarray, group=None):
+    """Run `group`'s YOLO model on one BGR frame and return the raw result (no drawing)."""
+    results = _run_model(frame, group)
+    if not results:
+        raise ValueError("No results returned by YOLO.")
+    return results[0]
+
+
+def detect_boxes(frame: np.ndarray, group=None):
+    """Run YOLO on one BGR frame and return its boxes as (labels, confs, xyxy) arrays."""
+    return boxes_to_arrays(predict_frame(frame, group))
+
+
+def analyze_frame(frame: np.ndarray, show_confidence=False, detector=None, timings=None, group=None):
+    """
+    Run YOLO on an in-memory BGR frame and draw annotations onto that
+    same buffer (in place). Nothing touches the disk.
+    `detector` replaces detect_boxes() (e.g. InferencePool.detect).
+    If `timings` is a dict, "inference"/"annotation" milliseconds are added to it.
+    Returns (annotated_frame, detections).
+    """
+    started = time.perf_counter()
+    labels, confs, xyxy = detector(frame) if detector else detect_boxes(frame, group)
+    inferred = time.perf_counter()
+    annotated, detections = draw_boxes(frame, labels, confs, xyxy, show_confidence=show_confidence,
+                                       group=group)
+    if timings is not None:
+        timings["inference"] = (inferred - started) * 1000
+        timings["annotation"] = (time.perf_counter() - inferred) * 1000
+    return annotated, detections
+
+
+def analyze_image(image, save_dir: Optional[str] = None, show_confidence=False, name=None,
+                  detector=None, group=None, on_saved=None):
+    """
+    Run `group`'s YOLO model on a single image and save annotated result.
+    `image` is a file path or a BGR NumPy frame. Frames are analyzed in
+    memory and the processed image is written asynchronously as
+    `processed_<name>`; use wait_for_writes() if the file must exist, or
+    pass `on_saved(future)` to hear when that write finishes (or fails).
+    `save_dir` defaults to the group's processed_dir.
+    `detector` replaces detect_boxes() (e.g. InferencePool.detect).
+    `name` overrides the output name for file paths too (default: basename).
+    Returns the path to the annotated image and a summary dictionary.
+    """
+    save_dir = save_dir or get_group(group).processed_dir
+    os.makedirs(save_dir, exist_ok=True)
+
+    if isinstance(image, np.ndarray):
+        name = name or f"frame_{int(time.time() * 1000)}.jpg"
+        timings = {}
+        annotated, detections = analyze_frame(image, show_confidence=show_confidence, detector=detector,
+                                              timings=timings, group=group)
+        metrics.record_timings(timings)
+        processed_path = os.path.join(save_dir, f"processed_{name}")
+        saved = write_image_async(processed_path, annotated)
+        if on_saved is not None:
+            saved.add_done_callback(on_saved)
+        return processed_path, _build_summary(name, processed_path, detections, annotated, timings, group)
+
+    # Load original image once; the same buffer feeds the model and the annotator
+    image_path = image
+    started = time.perf_counter()
+    img = cv2.imread(image_path)
+    if img is None:
+        raise ValueError(f"Failed to load {image_path}")
+    decoded = time.perf_counter()
+
+    boxes = detector(img) if detector else detect_boxes(img, group)
+    timings = {"decode": (decoded - started) * 1000, "inference": (time.perf_counter() - decoded) * 1000}
+    filename = name or os.path.basename(image_path)
+    return _annotate_and_save(img, boxes, image_path, filename, save_dir, show_confidence, timings, group)
+
+
+def wait_for_writes() -> None:
+    """Block until every write submitted so far has finished."""
+    submit_write(lambda: None).result()
+
+
+def analyze_images(sources, save_dir: Optional[str] = None, show_confidence=False,
+                   batch_size: int = DEFAULT_BATCH_SIZE, names=None, group=None):
+    """
+    Run `group`'s YOLO model on many images, `batch_size` images per model call.
+
+    `sources` may mix file paths and BGR NumPy frames. Each is saved as
+    `names[i]` when given, otherwise under its basename (files) or
+    `frame_<i>.jpg` (frames). Returns a list of
+    (processed_path, summary) pairs in input order, in the same format as
+    analyze_image().
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+
+    save_dir = save_dir or get_group(group).processed_dir
+    os.makedirs(save_dir, exist_ok=True)
+    sources = list(sources)
+    outputs = []
+
+    for start in range(0, len(sources), batch_size):
+        chunk = sources[start:start + batch_size]
+
+        # Decode each file once; the same buffer feeds the model and the annotator
+        images, entries = [], []
+        for offset, src in enumerate(chunk):
+            index = start + offset
+            if isinstance(src, np.ndarray):
+                img = src.copy()  # annotations are drawn in place; leave the caller's frame alone
+                name = names[index] if names else f"frame_{index}.jpg"
+                entries.append((name, name))
+            else:
+                img = cv2.imread(src)
+                if img is None:
+                    raise ValueError(f"Failed to load {src}")
+                entries.append((src, names[index] if names else os.path.basename(src)))
+            images.append(img)
+
+        started = time.perf_counter()
+        results = _run_model(images, group)
+        if not results or len(results) != len(images):
+            raise ValueError("No results returned by YOLO.")
+        # Batch inference time, shared out evenly
+        per_image = {"inference": (time.perf_counter() - started) * 1000 / len(images)}
+
+        for img, result, (source, name) in zip(images, results, entries):
+            outputs.append(_annotate_and_save(img, boxes_to_arrays(result), source, name,
+                                              save_dir, show_confidence, per_image, group))
+
+    return outputs
@@ -0,0 +1,89 @@
+import tkinter as tk
+from typing import Optional, Tuple
+
+import cv2
+from PIL import Image, ImageTk
+
+
+class PreviewRenderer:
+    """
+    Draws camera frames into a tk.Label through a single reused PhotoImage.
+
+    The output size is worked out once per label geometry change (or fixed
+    via `size`), frames are scaled with a fast OpenCV interpolation before
+    colour conversion, and a frame whose key hasn't changed since the last
+    call is not converted again.
+    """
+    def __init__(self, label: tk.Label, size: Optional[Tuple[int, int]] = None,
+                 max_size: Optional[Tuple[int, int]] = None):
+        self.label = label
+        self.fixed_size = size
+        self.max_size = max_size
+
+        self._photo: Optional[ImageTk.PhotoImage] = None
+        self._target: Optional[Tuple[int, int]] = None
+        self._frame_shape = None
+        self._last_key = None
+
+        if size is None:
+            label.bind("<Configure>", self._on_configure, add="+")
+
+    def _on_configure(self, event=None) -> None:
+        """Label geometry changed: recompute the output size on the next frame."""
+        self._target = None
+        self._last_key = None
+
+    def _fit(self, frame_w: int, frame_h: int) -> Tuple[int, int]:
+        """Largest size with the frame's aspect ratio that fits the label (and max_size)."""
+        if self.fixed_size:
+            return self.fixed_size
+
+        box_w, box_h = self.label.winfo_width(), self.label.winfo_height()
+        # Before the label is laid out it reports 1x1; fall back to the limits
+        max_w, max_h = self.max_size or (frame_w, frame_h)
+        box_w = min(box_w, max_w) if box_w > 1 else max_w
+        box_h = min(box_h, max_h) if box_h > 1 else max_h
+
+        scale = min(box_w / frame_w, box_h / frame_h)
+        return max(1, int(frame_w * scale)), max(1, int(frame_h * scale))
+
+    def needs_render(self, key) -> bool:
+        """False if a frame with this key is already on screen."""
+        return key is None or key != self._last_key
+
+    def render(self, frame, key=None) -> bool:
+        """
+        Show a BGR frame. `key` identifies its content (e.g. the camera frame
+        id); passing the same key again is a no-op. Returns True if drawn.
+        """
+        if not self.needs_render(key):
+            return False
+
+        h, w = frame.shape[:2]
+        if self._target is None or self._frame_shape != (h, w):
+            self._target = self._fit(w, h)
+            self._frame_shape = (h, w)
+
+        tw, th = self._target
+        if (tw, th) != (w, h):
+            interpolation = cv2.INTER_AREA if tw < w else cv2.INTER_LINEAR
+            frame = cv2.resize(frame, (tw, th), interpolation=interpolation)
+        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        img = Image.fromarray(frame_rgb)
+
+        if self._photo is None or (self._photo.width(), self._photo.height()) != (tw, th):
+            self._photo = ImageTk.PhotoImage(image=img)
+            self.label.config(image=self._photo)
+        else:
+            self._photo.paste(img)
+
+        self._last_key = key
+        return True
+
+    def clear(self) -> None:
+        """Blank the label and drop the buffer (e.g. when the camera stops)."""
+        self.label.config(image="")
+        self._photo = None
+        self._target = None
+        self._frame_shape = None
+        self._last_key = None
@@ -0,0 +1,110 @@
+import threading
+from collections import deque
+from typing import Callable, Optional
+
+
+class Job:
+    """A queued unit of work. cancel() drops it if it hasn't run, and suppresses its callbacks."""
+    def __init__(self, fn: Callable, args: tuple, on_done: Optional[Callable],
+                 on_error: Optional[Callable], key: Optional[str]):
+        self.fn = fn
+        self.args = args
+        self.on_done = on_done
+        self.on_error = on_error
+        self.key = key
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class InferenceScheduler:
+    """
+    One worker thread with a bounded queue for model jobs.
+
+    When the queue is full, `policy` decides: REJECT refuses the new job
+    (submit() returns None), COALESCE drops the oldest pending job in favour
+    of the new one. Submitting with a `key` cancels pending jobs with the
+    same key first. on_done/on_error run on the Tk thread via `root.after`.
+    """
+    REJECT = "reject"
+    COALESCE = "coalesce"
+
+    def __init__(self, root, max_pending: int = 1, policy: str = COALESCE):
+        if policy not in (self.REJECT, self.COALESCE):
+            raise ValueError(f"Unknown policy: {policy}")
+        self.root = root
+        self.max_pending = max_pending
+        self.policy = policy
+
+        self._pending = deque()
+        self._running: Optional[Job] = None
+        self._cond = threading.Condition()
+        threading.Thread(target=self._worker, name="inference-scheduler", daemon=True).start()
+
+    def submit(self, fn: Callable, *args, on_done: Optional[Callable] = None,
+               on_error: Optional[Callable] = None, key: Optional[str] = None) -> Optional[Job]:
+        """Queue fn(*args). Returns the Job, or None if rejected because the queue is full."""
+        job = Job(fn, args, on_done, on_error, key)
+        with self._cond:
+            if key is not None:
+                self._cancel_pending(key)
+
+            if len(self._pending) >= self.max_pending:
+                if self.policy == self.REJECT:
+                    return None
+                self._pending.popleft().cancel()
+
+            self._pending.append(job)
+            self._cond.notify()
+        return job
+
+    def cancel(self, key: Optional[str] = None) -> None:
+        """Cancel pending and running jobs with `key` (all jobs if None)."""
+        with self._cond:
+            self._cancel_pending(key)
+            running = self._running
+            if running is not None and (key is None or running.key == key):
+                running.cancel()
+
+    def _cancel_pending(self, key: Optional[str]) -> None:
+        kept = deque()
+        for job in self._pending:
+            if key is None or job.key == key:
+                job.cancel()
+            else:
+                kept.append(job)
+        self._pending = kept
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                job = self._pending.popleft()
+                self._running = job
+
+            if not job.cancelled:
+                try:
+                    result = job.fn(*job.args)
+                except Exception as e:
+                    self._deliver(job, job.on_error, e)
+                else:
+                    self._deliver(job, job.on_done, result)
+
+            with self._cond:
+                self._running = None
+
+    def _deliver(self, job: Job, callback: Optional[Callable], value) -> None:
+        """Run `callback(value)` on the Tk thread unless the job was cancelled meanwhile."""
+        if callback is None:
+            return
+
+        def _call():
+            if not job.cancelled:
+                callback(value)
+
+        try:
+            self.root.after(0, _call)
+        except RuntimeError:
+            pass  # Tk has been destroyed
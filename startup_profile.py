@@ -0,0 +1,126 @@
+"""
+Startup profiling: where does the time go before mainloop()?
+
+    python main.py --profile-startup
+    python main.py --profile-startup --budget startup_budget.json --report startup_report.json
+
+Measures, in order: time until the login screen is interactive, the cold
+import of each heavy library not already loaded by then, model load, and
+the constructor of every page. Writes a JSON report and exits non-zero if
+any entry exceeds its budget, so a CI job can fail on a startup regression.
+"""
+import importlib
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+HEAVY_MODULES = ("numpy", "cv2", "PIL.Image", "PIL.ImageTk", "customtkinter", "ultralytics")
+DEFAULT_BUDGET_FILE = "startup_budget.json"
+DEFAULT_REPORT_FILE = "startup_report.json"
+
+
+class StartupProfile:
+    """Ordered (name, seconds) timings. Disabled instances cost one attribute check per timed()."""
+    def __init__(self):
+        self.enabled = False
+        self.entries = []
+
+    def record(self, name: str, seconds: float) -> None:
+        if self.enabled:
+            self.entries.append((name, seconds))
+
+    @contextmanager
+    def timed(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def report(self) -> str:
+        width = max((len(name) for name, _ in self.entries), default=10)
+        return "\n".join(f"  {name:<{width}}  {seconds * 1000:9.1f} ms" for name, seconds in self.entries)
+
+    def check(self, budget: dict):
+        """[(name, seconds, limit)] for every entry over its budget (names missing from `budget` pass)."""
+        return [(name, seconds, budget[name]) for name, seconds in self.entries
+                if name in budget and seconds > budget[name]]
+
+    def write(self, path: str, budget: dict) -> None:
+        over = {name for name, _, _ in self.check(budget)}
+        with open(path, "w") as f:
+            json.dump({
+                "created": int(time.time()),
+                "python": sys.version.split()[0],
+                "entries": [{"name": name, "ms": round(seconds * 1000, 1),
+                             "budget_ms": round(budget[name] * 1000, 1) if name in budget else None,
+                             "over_budget": name in over}
+                            for name, seconds in self.entries],
+            }, f, indent=2)
+
+
+# Shared instance; VisionBoard.get_frame() times page constructors through it
+profile = StartupProfile()
+
+
+def load_budget(path: str) -> dict:
+    """{entry name: seconds}. A missing file means no budget."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return {name: float(seconds) for name, seconds in json.load(f).items()}
+
+
+def run(report_path: str = DEFAULT_REPORT_FILE, budget_path: str = DEFAULT_BUDGET_FILE) -> int:
+    """Profile a full startup (without entering mainloop). Returns the process exit code."""
+    profile.enabled = True
+    started = time.perf_counter()
+
+    # What the operator waits for: the login screen, painted and responsive
+    with profile.timed("interactive"):
+        with profile.timed("import app"):
+            from app import PAGES, VisionBoard
+        app = VisionBoard()
+        app.update()
+
+    # Cold cost of each heavy library the login screen managed to avoid
+    for module in HEAVY_MODULES:
+        if module in sys.modules:
+            continue
+        module_started = time.perf_counter()
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            profile.record(f"import {module} (missing)", 0.0)
+        else:
+            profile.record(f"import {module}", time.perf_counter() - module_started)
+
+    # Synchronous model load (the app normally does this on a background thread)
+    try:
+        import predict
+        with profile.timed("model load"):
+            predict.registry.get(predict.MODEL_PATH)
+    except Exception as e:
+        print(f"Model load failed: {e}", file=sys.stderr)
+
+    # Remaining page constructors, timed inside get_frame()
+    for page_name in PAGES:
+        app.get_frame(page_name)
+    app.update()
+    profile.record("total", time.perf_counter() - started)
+    app.destroy()
+
+    budget = load_budget(budget_path)
+    profile.write(report_path, budget)
+    print(f"Startup profile (report: {report_path}):")
+    print(profile.report())
+
+    over = profile.check(budget)
+    for name, seconds, limit in over:
+        print(f"OVER BUDGET {name}: {seconds * 1000:.0f} ms > {limit * 1000:.0f} ms", file=sys.stderr)
+    return 1 if over else 0
@@ -0,0 +1,192 @@
+"""
+Detection summary files.
+
+Version 1 layout (JSON, or the same content as columnar arrays in .npz):
+
+    {
+        "schema": "visionboard.summary",
+        "version": 1,
+        "created": <unix time the summary was written>,
+        "captured": <unix time the image was taken, or null>,
+        "email": <user who captured it, or null>,
+        "image": {"file": ..., "processed_file": ..., "width": ..., "height": ...},
+        "model": {"path": ..., "version": ..., "group": "defect_a"},
+        "timings_ms": {"inference": ..., "annotation": ..., ...},
+        "detections": [{"id": "A1", "class": "Broken Traces", "confidence": 0.91,
+                        "bbox": [x1, y1, x2, y2]}, ...]
+    }
+
+Files written before versioning are a bare JSON list of detections;
+read_summary() upgrades them on the fly. "model.group" (the inspection
+group, see groups.py) is absent from older v1 files; readers treat that
+as the default group. "captured" and "email" are absent from older v1
+files too; parse_capture_name() recovers both from capture filenames.
+"""
+import json
+import os
+import re
+import tempfile
+import time
+
+SCHEMA = "visionboard.summary"
+SCHEMA_VERSION = 1
+
+# Detection sets at least this large are written as .npz unless told otherwise
+BINARY_THRESHOLD = 200
+
+# <email>_<unix time>.<ext>, as the camera pages name captures
+_CAPTURE_NAME = re.compile(r"^(?P<email>[^@\s]+@[^@\s]+)_(?P<ts>\d+)\.[^.]+$")
+_EARLIEST_TS = 1_000_000_000  # 2001; smaller numbers in a name aren't capture times
+
+
+def parse_capture_name(filename):
+    """(email, unix time) from a capture's image filename, or (None, None) if it isn't one."""
+    match = _CAPTURE_NAME.match(filename)
+    if not match:
+        return None, None
+    ts = int(match.group("ts"))
+    if not _EARLIEST_TS <= ts <= time.time() + 86400:
+        return None, None
+    return match.group("email"), ts
+
+
+def build_summary(detections, image_file=None, processed_file=None, image_size=None,
+                  model_path=None, model_version=None, timings=None, group=None, email=None,
+                  captured=None):
+    """Assemble a version-1 summary dict. `image_size` is (width, height)."""
+    width, height = image_size if image_size else (None, None)
+    return {
+        "schema": SCHEMA,
+        "version": SCHEMA_VERSION,
+        "created": int(time.time()),
+        "captured": captured,
+        "email": email,
+        "image": {
+            "file": image_file,
+            "processed_file": processed_file,
+            "width": width,
+            "height": height,
+        },
+        "model": {"path": model_path, "version": model_version, "group": group},
+        "timings_ms": {k: round(v, 2) for k, v in (timings or {}).items()},
+        "detections": list(detections),
+    }
+
+
+def from_analysis(summary: dict, image_file=None, email=None, captured=None) -> dict:
+    """Version-1 summary from the dict returned by predict.analyze_image()."""
+    return build_summary(
+        summary.get("detections", []),
+        image_file=image_file or summary.get("file"),
+        processed_file=summary.get("processed_file"),
+        image_size=summary.get("image_size"),
+        model_path=summary.get("model_path"),
+        model_version=summary.get("model_version"),
+        timings=summary.get("timings_ms"),
+        group=summary.get("group"),
+        email=email,
+        captured=captured,
+    )
+
+
+def summary_extension(detections, binary=None) -> str:
+    """".npz" for large detection sets (or when binary=True), else ".json"."""
+    if binary is None:
+        binary = len(detections) >= BINARY_THRESHOLD
+    return ".npz" if binary else ".json"
+
+
+def write_summary(path: str, summary: dict) -> str:
+    """
+    Write `summary` in the format implied by the extension of `path`,
+    atomically (temp file + rename), so scanners never see half a file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_", suffix=os.path.splitext(path)[1])
+    try:
+        if path.endswith(".npz"):
+            with os.fdopen(fd, "wb") as f:
+                _write_npz(f, summary)
+        else:
+            with os.fdopen(fd, "w") as f:
+                json.dump(summary, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return path
+
+
+def read_summary(path: str) -> dict:
+    """Load any summary file (legacy list, v1 JSON or .npz) as a v1 dict."""
+    if path.endswith(".npz"):
+        return _read_npz(path)
+
+    with open(path, "r") as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        # Pre-versioning file: just the detections
+        summary = build_summary(data)
+        summary["version"] = 0
+        summary["created"] = None
+        return summary
+    return data
+
+
+def read_detections(path: str):
+    """Just the detections list from any summary file."""
+    return read_summary(path).get("detections", [])
+
+
+# ---------------- Columnar encoding ----------------
+def _write_npz(f, summary: dict) -> None:
+    import numpy as np
+
+    detections = summary.get("detections", [])
+    meta = {k: v for k, v in summary.items() if k != "detections"}
+    np.savez_compressed(
+        f,
+        meta=np.array(json.dumps(meta)),
+        ids=np.array([d.get("id", "") for d in detections], dtype=str),
+        classes=np.array([d.get("class", "") for d in detections], dtype=str),
+        confidence=np.array([d.get("confidence", 0.0) for d in detections], dtype=np.float32),
+        bbox=np.array([d.get("bbox", [0, 0, 0, 0]) for d in detections], dtype=np.int32).reshape(-1, 4),
+    )
+
+
+def _read_npz(path: str) -> dict:
+    import numpy as np
+
+    with np.load(path, allow_pickle=False) as data:
+        summary = json.loads(str(data["meta"]))
+        summary["detections"] = [
+            {"id": i, "class": c, "confidence": round(float(conf), 2), "bbox": box}
+            for i, c, conf, box in zip(data["ids"].tolist(), data["classes"].tolist(),
+                                       data["confidence"].tolist(), data["bbox"].tolist())
+        ]
+    return summary
+
+
+def read_columns(path: str):
+    """
+    (meta, ids, classes, confidence, bbox): the summary without its
+    detections, plus the detections as arrays without building
+    per-detection dicts -- the fast path for analytics over many files.
+    """
+    import numpy as np
+
+    if path.endswith(".npz"):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            return meta, data["ids"], data["classes"], data["confidence"], data["bbox"]
+
+    meta = read_summary(path)
+    detections = meta.pop("detections", [])
+    return (meta,
+            np.array([d.get("id", "") for d in detections], dtype=str),
+            np.array([d.get("class", "") for d in detections], dtype=str),
+            np.array([d.get("confidence", 0.0) for d in detections], dtype=np.float32),
+            np.array([d.get("bbox", [0, 0, 0, 0]) for d in detections], dtype=np.int32).reshape(-1, 4))
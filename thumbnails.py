@@ -0,0 +1,159 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from PIL import Image
+
+THUMBNAIL_DIR = os.path.join("processed_results", ".thumbnails")
+MEMORY_BUDGET = 64 * 1024 * 1024  # decoded RGB bytes held in the LRU
+DISK_MAX_FILES = 2000             # ~20 KB per 320x240 preview
+
+
+def _nbytes(img: Image.Image) -> int:
+    return img.width * img.height * len(img.getbands())
+
+
+class ThumbnailCache:
+    """
+    Downscaled copies of images, keyed by path + mtime + file size + target
+    size. Hits come from an in-memory LRU first, then from JPEGs on disk, so
+    a full-resolution decode only happens the first time an image is shown
+    at a given size (or after the file changes).
+
+    Both tiers are bounded: the LRU by decoded bytes (a full-screen image
+    is ~8 MB, a preview ~230 KB), the disk by file count, pruning the
+    least recently used files (and orphans of changed images) first.
+    """
+    def __init__(self, cache_dir: str = THUMBNAIL_DIR, max_bytes: int = MEMORY_BUDGET,
+                 max_files: int = DISK_MAX_FILES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_files = None  # counted on the first store
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(path: str, max_size: Tuple[int, int]):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return os.path.abspath(path), st.st_mtime_ns, st.st_size, tuple(max_size)
+
+    def _disk_path(self, key) -> str:
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.jpg")
+
+    def get(self, path: str, max_size: Tuple[int, int]) -> Optional[Image.Image]:
+        """Image at `path` scaled to fit `max_size` (RGB), or None if unreadable."""
+        key = self._key(path, max_size)
+        if key is None:
+            return None
+
+        with self._lock:
+            img = self._memory.get(key)
+            if img is not None:
+                self._memory.move_to_end(key)
+                return img
+
+        disk_path = self._disk_path(key)
+        img = None
+        if os.path.exists(disk_path):
+            try:
+                img = Image.open(disk_path)
+                img.load()
+                os.utime(disk_path)  # mark as recently used for pruning
+            except Exception:
+                img = None
+
+        if img is None:
+            img, shrunk = self._render(path, max_size)
+            if img is None:
+                return None
+            # Images that already fit gain nothing from a (lossy) disk copy
+            if shrunk:
+                self._store_on_disk(disk_path, img)
+
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_bytes -= _nbytes(old)
+            self._memory[key] = img
+            self._memory_bytes += _nbytes(img)
+            # Always keep the image just added, even if it alone is over budget
+            while self._memory_bytes > self.max_bytes and len(self._memory) > 1:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= _nbytes(evicted)
+        return img
+
+    @staticmethod
+    def _render(path: str, max_size: Tuple[int, int]):
+        """Decode `path` once and shrink it to fit `max_size`. Returns (image, shrunk)."""
+        try:
+            img = Image.open(path)
+            original_size = img.size
+            img.draft("RGB", max_size)  # JPEG: let the decoder downscale for us
+            img = img.convert("RGB")
+        except Exception:
+            return None, False
+        img.thumbnail(max_size)
+        return img, img.size != original_size
+
+    def _store_on_disk(self, disk_path: str, img: Image.Image) -> None:
+        """Write atomically; a failed write just means a miss next time."""
+        tmp_path = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".jpg")
+            with os.fdopen(fd, "wb") as f:
+                img.save(f, "JPEG", quality=90)
+            os.replace(tmp_path, disk_path)
+        except Exception:
+            if tmp_path and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            return
+
+        with self._lock:
+            if self._disk_files is None:
+                self._disk_files = len(self._list_disk())
+            else:
+                self._disk_files += 1
+            if self._disk_files <= self.max_files:
+                return
+            self._disk_files = self._prune_disk()
+
+    def _list_disk(self):
+        try:
+            with os.scandir(self.cache_dir) as entries:
+                return [e for e in entries if e.is_file() and e.name.endswith(".jpg")]
+        except OSError:
+            return []
+
+    def _prune_disk(self) -> int:
+        """Delete least recently used files down to 90% of max_files. Returns how many remain."""
+        files = []
+        for entry in self._list_disk():
+            try:
+                files.append((entry.stat().st_mtime_ns, entry.path))
+            except OSError:
+                pass
+        files.sort()
+        # Prune with some headroom so the directory isn't listed on every store
+        excess = len(files) - int(self.max_files * 0.9)
+        removed = 0
+        for _, path in files[:max(excess, 0)]:
+            try:
+                os.unlink(path)
+                removed += 1
+            except OSError:
+                pass
+        return len(files) - removed
+
+
+# Shared instance used by DefectResult and Profile
+thumbnail_cache = ThumbnailCache()